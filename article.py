@@ -0,0 +1,34 @@
+"""
+article.py — The one record that flows fetch → LLM → render.
+
+Fetchers create an Article per story; the LLM fills in the verdict fields on
+the same object and the renderer reads them back, so nothing is copied
+between stages. __slots__ keeps each record small (no per-instance dict), and
+source names are interned since thousands of articles share a handful.
+"""
+
+import sys
+
+
+class Article:
+    __slots__ = (
+        "title", "summary", "url", "source", "published",
+        "rank",   # position of its fetch job in config order (lower = higher priority)
+        # Verdict fields — set by llm.analyze
+        "category", "one_line_summary", "cluster_id", "backend",
+    )
+
+    def __init__(self, title, summary, url, source, published=None):
+        self.title = title
+        self.summary = summary
+        self.url = url
+        self.source = sys.intern(source)
+        self.published = published   # aware UTC datetime, when the source gives one
+        self.rank = 0
+        self.category = None
+        self.one_line_summary = None
+        self.cluster_id = None
+        self.backend = None
+
+    def __repr__(self):
+        return f"Article({self.title!r}, source={self.source!r}, category={self.category!r})"
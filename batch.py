@@ -0,0 +1,311 @@
+"""
+batch.py — Bulk classification through the providers' batch APIs.
+
+For backfills, re-classifying the history after a prompt change, and
+overnight runs that don't need an answer within minutes. Articles go to
+Anthropic's Message Batches API or OpenAI's Batch API instead of
+llm.analyze's interactive calls. These are billed at about half price, run
+outside the interactive rate limits, and finish within 24 hours.
+
+  python run.py batch submit                          # fetch now, classify offline
+  python run.py batch submit --history --since 90d    # re-classify the history
+  python run.py batch poll                            # wait, then merge into history
+  python run.py batch poll --once                     # check once (for cron)
+  python run.py batch poll --retry-failed             # poll failed jobs again
+  python run.py batch status
+
+Every submitted job goes into BATCH_STATE_FILE as soon as the provider
+accepts it. The entry holds the provider's batch id and the articles behind
+each request, so `poll` can pick up after a restart. A job leaves the file
+once its results are in the history DB. A job whose status check fails
+with anything but a connection error or timeout (an unknown batch id,
+rejected credentials, ...) stays in the file marked failed, and isn't
+polled again until `--retry-failed`.
+
+The providers' base URLs are configurable (CLAUDE_BASE_URL, OPENAI_BASE_URL),
+so all of this runs against a local stand-in — see `python bench.py batch`.
+"""
+
+import datetime
+import io
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import llm
+import store
+from article import Article
+
+BACKENDS = ("claude", "openai")
+
+
+def submit(articles, config, backend=None, day=None, attempt=1):
+    """Send `articles` to `backend`'s batch API, BATCH_ARTICLES_PER_REQUEST to
+    a request, and record the job(s). `day` is the date they go into the
+    history under (default today; kept for articles already there).
+    `attempt` counts resubmissions of requests that failed."""
+    backend = backend or _default_backend(config)
+    per_request = getattr(config, "BATCH_ARTICLES_PER_REQUEST", 25)
+    per_job = getattr(config, "BATCH_MAX_REQUESTS", 10_000)
+    day = day or datetime.date.today().isoformat()
+
+    requests = [articles[i:i + per_request] for i in range(0, len(articles), per_request)]
+    ids = []
+    for first in range(0, len(requests), per_job):
+        chunk = {f"r{first + i}": batch for i, batch in enumerate(requests[first:first + per_job])}
+        prompts = {custom_id: llm._build_prompt(batch, config) for custom_id, batch in chunk.items()}
+        job_id = _SUBMIT[backend](prompts, config)
+        # Saved straight away: from here on the provider is billing for it
+        state = _load_state(config)
+        state["jobs"].append({
+            "id": job_id,
+            "backend": backend,
+            "day": day,
+            "submitted": datetime.datetime.now().isoformat(timespec="seconds"),
+            "attempt": attempt,
+            "requests": {custom_id: [[a.title, a.summary, a.url, a.source] for a in batch]
+                         for custom_id, batch in chunk.items()},
+        })
+        _save_state(state, config)
+        ids.append(job_id)
+        print(f"[batch] Submitted {job_id} to {backend}: {len(chunk)} requests, "
+              f"{sum(len(b) for b in chunk.values())} articles"
+              + (f" (attempt {attempt})" if attempt > 1 else ""))
+    return ids
+
+
+def poll(config, once=False, retry_failed=False):
+    """Check every pending job and merge finished ones into the history. Keeps
+    polling with backoff (BATCH_POLL_SECONDS, doubling up to
+    BATCH_POLL_MAX_SECONDS) until none is left, unless `once`. Only
+    connection errors and timeouts are retried; any other error marks the
+    job failed. Returns the number of jobs left (pending or failed)."""
+    if retry_failed:
+        state = _load_state(config)
+        for job in state["jobs"]:
+            if job.pop("failed", None):
+                job["attempt"] = 1   # and a fresh round of resubmissions
+        _save_state(state, config)
+
+    delay = getattr(config, "BATCH_POLL_SECONDS", 30)
+    while True:
+        for job in _load_state(config)["jobs"]:
+            if job.get("failed"):
+                print(f"[batch] {job['id']} ({job['backend']}): failed — {job['failed']}")
+                continue
+            try:
+                outcome, counts = _STATUS[job["backend"]](job["id"], config)
+                print(f"[batch] {job['id']} ({job['backend']}): {outcome} {counts}")
+                if outcome != "running":
+                    _merge(job, config)
+            except llm.BackendError:
+                raise   # missing package or key: nothing any job can do about it
+            except Exception as e:
+                if not isinstance(e, _transient_errors(job["backend"])):
+                    print(f"[batch] {job['id']}: {e} — marked failed")
+                    _mark_failed(job["id"], str(e), config)
+                else:
+                    print(f"[batch] {job['id']}: {e} — will retry")
+
+        # Counted from the file: merging can add jobs (resubmitted requests)
+        jobs = _load_state(config)["jobs"]
+        failed = sum(1 for job in jobs if job.get("failed"))
+        pending = len(jobs) - failed
+        if not pending or once:
+            if failed:
+                print(f"[batch] {failed} job(s) failed — `python run.py batch poll --retry-failed` "
+                      "polls them again; or remove them from the state file")
+            return pending + failed
+        print(f"[batch] {pending} job(s) still running — next check in {delay:.0f}s")
+        time.sleep(delay)
+        delay = min(delay * 2, getattr(config, "BATCH_POLL_MAX_SECONDS", 900))
+
+
+def status(config):
+    jobs = _load_state(config)["jobs"]
+    for job in jobs:
+        articles = sum(len(r) for r in job["requests"].values())
+        print(f"  {job['id']}  {job['backend']:<7} submitted {job['submitted']}  "
+              f"{len(job['requests'])} requests, {articles} articles"
+              + (f"  FAILED: {job['failed']}" if job.get("failed") else ""))
+    if not jobs:
+        print("  (no pending batch jobs)")
+
+
+def _merge(job, config):
+    """Apply a finished job's verdicts and save them to the history, then
+    drop the job from the state file. Articles the model didn't keep are
+    removed from the history, so a re-classification doesn't leave them
+    under their old category. Articles in requests that errored or expired
+    are submitted again as a new job, up to BATCH_MAX_ATTEMPTS; after that
+    the job stays in the state file, marked failed, holding just them.
+    Saving and removing are idempotent, so a crash before the state file
+    is updated just merges the same results again next time."""
+    analyzed, dropped, answered = [], [], set()
+    for custom_id, text in _RESULTS[job["backend"]](job["id"], config):
+        rows = job["requests"].get(custom_id)
+        if rows is None or text is None:
+            continue
+        answered.add(custom_id)
+        articles = [Article(*row) for row in rows]
+        kept = llm._apply_verdicts(articles, llm._parse_response(text), job["backend"])
+        analyzed += kept
+        dropped += [a for a in articles if a not in kept]
+
+    total = sum(len(r) for r in job["requests"].values())
+    unanswered = {custom_id: rows for custom_id, rows in job["requests"].items() if custom_id not in answered}
+    failed = sum(len(rows) for rows in unanswered.values())
+    print(f"[batch] {job['id']}: {len(analyzed)} of {total} articles relevant"
+          + (f", {failed} not classified (their requests failed)" if failed else ""))
+    if dropped:
+        store.forget(dropped, config)
+    if analyzed:
+        store.save(analyzed, config, day=job["day"], replace=True)
+
+    attempt = job.get("attempt", 1)
+    retry = unanswered and attempt < getattr(config, "BATCH_MAX_ATTEMPTS", 3)
+    if retry:
+        submit([Article(*row) for rows in unanswered.values() for row in rows], config,
+               backend=job["backend"], day=job["day"], attempt=attempt + 1)
+
+    state = _load_state(config)
+    if unanswered and not retry:
+        print(f"[batch] {job['id']}: {failed} articles still not classified after {attempt} attempts")
+        for j in state["jobs"]:
+            if j["id"] == job["id"]:
+                j["requests"] = unanswered
+                j["failed"] = f"{failed} articles not classified after {attempt} attempts"
+    else:
+        state["jobs"] = [j for j in state["jobs"] if j["id"] != job["id"]]
+    _save_state(state, config)
+
+
+def _transient_errors(backend):
+    """The provider SDK's connection error (timeouts are a subclass)."""
+    if backend == "claude":
+        import anthropic
+        return (anthropic.APIConnectionError,)
+    import openai
+    return (openai.APIConnectionError,)
+
+
+def _default_backend(config):
+    for name in llm.backend_chain(config):
+        if name in BACKENDS:
+            return name
+    sys.exit("Batch mode needs claude or openai in LLM_BACKEND(S), or --backend")
+
+
+# ── STATE FILE ────────────────────────────────────────────────────────────────
+
+def _state_path(config):
+    return Path(__file__).parent / getattr(config, "BATCH_STATE_FILE", "batches.json")
+
+
+def _load_state(config):
+    try:
+        return json.loads(_state_path(config).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {"jobs": []}
+
+
+def _mark_failed(job_id, error, config):
+    state = _load_state(config)
+    for job in state["jobs"]:
+        if job["id"] == job_id:
+            job["failed"] = error
+    _save_state(state, config)
+
+
+def _save_state(state, config):
+    # Written to a temp name and renamed, so a crash never leaves half a file
+    path = _state_path(config)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(state), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+# ── CLAUDE (Message Batches API) ──────────────────────────────────────────────
+
+def _submit_claude(prompts, config):
+    client = llm._get_claude_client(config)
+    batch = client.messages.batches.create(requests=[
+        {"custom_id": custom_id, "params": llm._claude_params(prompt, config)}
+        for custom_id, prompt in prompts.items()])
+    return batch.id
+
+
+def _status_claude(job_id, config):
+    batch = llm._get_claude_client(config).messages.batches.retrieve(job_id)
+    c = batch.request_counts
+    counts = (f"({c.succeeded} succeeded, {c.errored} errored, {c.expired} expired, "
+              f"{c.canceled} canceled, {c.processing} processing)")
+    return ("running" if batch.processing_status != "ended" else "ended"), counts
+
+
+def _results_claude(job_id, config):
+    """(custom_id, response text or None if the request failed) per request."""
+    input_tokens = output_tokens = 0
+    for entry in llm._get_claude_client(config).messages.batches.results(job_id):
+        if entry.result.type != "succeeded":
+            print(f"[batch] {entry.custom_id}: {entry.result.type}")
+            yield entry.custom_id, None
+            continue
+        message = entry.result.message
+        input_tokens += message.usage.input_tokens
+        output_tokens += message.usage.output_tokens
+        yield entry.custom_id, message.content[0].text
+    print(f"[batch] claude: input {input_tokens} tok, output {output_tokens} tok")
+
+
+# ── OPENAI (Batch API) ────────────────────────────────────────────────────────
+
+def _submit_openai(prompts, config):
+    client = llm._get_openai_client(config)
+    lines = "".join(json.dumps({"custom_id": custom_id, "method": "POST", "url": "/v1/chat/completions",
+                                "body": llm._openai_body(prompt, config)}) + "\n"
+                    for custom_id, prompt in prompts.items())
+    upload = client.files.create(file=("requests.jsonl", io.BytesIO(lines.encode())), purpose="batch")
+    batch = client.batches.create(input_file_id=upload.id, endpoint="/v1/chat/completions",
+                                  completion_window="24h")
+    return batch.id
+
+
+def _status_openai(job_id, config):
+    batch = llm._get_openai_client(config).batches.retrieve(job_id)
+    c = batch.request_counts
+    counts = f"({c.completed} completed, {c.failed} failed of {c.total})" if c else ""
+    running = batch.status in ("validating", "in_progress", "finalizing", "cancelling")
+    return ("running" if running else batch.status), counts
+
+
+def _results_openai(job_id, config):
+    """(custom_id, response text or None if the request failed) per request.
+    Expired and cancelled batches still return what finished."""
+    client = llm._get_openai_client(config)
+    batch = client.batches.retrieve(job_id)
+    prompt_tokens = completion_tokens = 0
+    for file_id in (batch.output_file_id, batch.error_file_id):
+        if not file_id:
+            continue
+        for line in client.files.content(file_id).text.splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            response = entry.get("response") or {}
+            if entry.get("error") or response.get("status_code") != 200:
+                print(f"[batch] {entry['custom_id']}: {entry.get('error') or response.get('status_code')}")
+                yield entry["custom_id"], None
+                continue
+            body = response["body"]
+            prompt_tokens += body.get("usage", {}).get("prompt_tokens", 0)
+            completion_tokens += body.get("usage", {}).get("completion_tokens", 0)
+            yield entry["custom_id"], body["choices"][0]["message"]["content"]
+    print(f"[batch] openai: prompt {prompt_tokens} tok, completion {completion_tokens} tok")
+
+
+_SUBMIT = {"claude": _submit_claude, "openai": _submit_openai}
+_STATUS = {"claude": _status_claude, "openai": _status_openai}
+_RESULTS = {"claude": _results_claude, "openai": _results_openai}
@@ -0,0 +1,699 @@
+#!/usr/bin/env python3
+"""
+bench.py — Micro-benchmarks for the digest pipeline. No network needed.
+
+Usage:
+  python bench.py memory [-n 10000]   # Article records vs per-article dicts
+  python bench.py startup             # CLI import time + time to first network call
+  python bench.py page [-n 60]        # production page size / render-blocking budgets
+  python bench.py search [-n 30000]   # search index build + per-query bytes/time
+  python bench.py clean               # summary cleaner vs the old regex on big summaries
+  python bench.py prompt              # prompt tokens: compact encoding vs indented JSON
+  python bench.py stream              # fetch peak memory: list API vs streaming iterators
+  python bench.py store [-n 200000]   # history DB: trend query times over years of articles
+  python bench.py lazy                # chunked page: HTML size / cards vs article count
+  python bench.py batch [-n 2000]     # batch mode end to end against a local stand-in API
+"""
+
+import argparse
+import contextlib
+import gc
+import gzip
+import io
+import json
+import pathlib
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from article import Article
+
+SOURCES = ["STAT", "MIT Technology Review", "IEEE Spectrum", "Hacker News", "TechCrunch"]
+
+
+def _fresh(s):
+    # Parsers hand back a new string object per entry, even for equal text
+    return "".join(list(s))
+
+
+def _dict_pipeline(n):
+    # Today's shape: fetcher dict → prompt dict → LLM result dict
+    fetched = [{
+        "title": f"Article {i} about brain-computer interfaces",
+        "summary": "x" * 300,
+        "url": f"https://example.com/{i}",
+        "source": _fresh(SOURCES[i % len(SOURCES)]),
+    } for i in range(n)]
+    prompt = [{"title": a["title"], "summary": a["summary"], "url": a["url"], "source": a["source"]}
+              for a in fetched]
+    analyzed = [{"title": a["title"], "url": a["url"], "source": a["source"],
+                 "category": "research", "one_line_summary": "y" * 80} for a in fetched]
+    return fetched, prompt, analyzed
+
+
+def _article_pipeline(n):
+    fetched = [Article(
+        title=f"Article {i} about brain-computer interfaces",
+        summary="x" * 300,
+        url=f"https://example.com/{i}",
+        source=_fresh(SOURCES[i % len(SOURCES)]),
+    ) for i in range(n)]
+    for a in fetched:
+        a.category = "research"
+        a.one_line_summary = "y" * 80
+    return fetched
+
+
+def _peak(fn, n):
+    gc.collect()
+    tracemalloc.start()
+    result = fn(n)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak
+
+
+def bench_memory(n):
+    dicts = _peak(_dict_pipeline, n)
+    articles = _peak(_article_pipeline, n)
+    print(f"{n} articles, fetch → analyze → render records")
+    print(f"  dicts:    {dicts / 1e6:7.2f} MB  ({dicts / n:.0f} B/article)")
+    print(f"  Article:  {articles / 1e6:7.2f} MB  ({articles / n:.0f} B/article)")
+    print(f"  saved:    {1 - articles / dicts:.0%}")
+
+
+# Packages that must not load until the code path that uses them runs
+HEAVY_MODULES = ("feedparser", "requests", "anthropic", "openai")
+
+# Child-process prelude: stop at the first DNS lookup / connect and report it
+_FIRST_NETWORK_CALL = """
+import os, socket, sys, time
+def _stop(*args, **kwargs):
+    sys.stdout.write(f"FIRST_NETWORK_CALL {time.perf_counter() * 1000:.1f}\\n")
+    sys.stdout.flush()
+    os._exit(0)
+socket.getaddrinfo = _stop
+socket.socket.connect = _stop
+sys.argv = ["run.py", "--fetch-only", "--no-open"]
+import runpy
+runpy.run_path("run.py", run_name="__main__")
+"""
+
+
+def bench_startup(budget_ms):
+    root = pathlib.Path(__file__).parent
+
+    # 1. What `run.py --help` imports, and how long it takes
+    proc = subprocess.run([sys.executable, "-X", "importtime", "run.py", "--help"],
+                          cwd=root, capture_output=True, text=True)
+    own = {p.stem for p in root.glob("*.py")}
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cum, name = line.split("|")
+        if cum.strip().isdigit():
+            cumulative[name.strip()] = int(cum)
+    ours = sum(us for name, us in cumulative.items() if name in own)
+    print(f"run.py --help: repo modules {ours / 1000:.1f} ms "
+          f"({', '.join(sorted(n for n in cumulative if n in own))})")
+    heavy = sorted(n for n in cumulative if n.split(".")[0] in HEAVY_MODULES)
+    if heavy:
+        print(f"  FAIL: --help imported {', '.join(heavy)}")
+
+    # 2. --fetch-only: wall time from process start to the first network call,
+    #    minus bare interpreter startup (site-packages .pth files etc. aren't
+    #    ours to fix). Best of 5 to keep scheduler noise out.
+    def best_of(args, runs=5):
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            proc = subprocess.run([sys.executable, *args], cwd=root, capture_output=True, text=True)
+            times.append((time.perf_counter() - start) * 1000)
+        return min(times), proc
+
+    interpreter, _ = best_of(["-c", "pass"])
+    elapsed, proc = best_of(["-c", _FIRST_NETWORK_CALL])
+    if "FIRST_NETWORK_CALL" not in proc.stdout:
+        print(f"  FAIL: --fetch-only made no network call\n{proc.stdout}{proc.stderr}")
+        return False
+    net = elapsed - interpreter
+    print(f"run.py --fetch-only: first network call after {elapsed:.1f} ms "
+          f"({net:.1f} ms over a bare interpreter's {interpreter:.1f} ms; budget {budget_ms} ms)")
+    if net > budget_ms:
+        print("  FAIL: over budget")
+    return not heavy and net <= budget_ms
+
+
+def _sample_articles(n):
+    import renderer
+
+    categories = list(renderer.CATEGORY_ORDER)
+    articles = []
+    for i in range(n):
+        a = Article(
+            title=f"Startup {i} raises Series A for a minimally invasive brain-computer interface",
+            summary="x" * 300,
+            url=f"https://example.com/news/2026/10/{i}/startup-raises-series-a",
+            source=SOURCES[i % len(SOURCES)],
+        )
+        a.category = categories[i % len(categories)]
+        a.one_line_summary = "The company will use the round to start its first human feasibility study."
+        a.backend = "claude"
+        articles.append(a)
+    return articles
+
+
+def bench_page(n):
+    import config
+    import renderer
+
+    config.PRODUCTION_OUTPUT = True
+    with tempfile.TemporaryDirectory() as tmp:
+        out = pathlib.Path(tmp) / "digest.html"
+        renderer.render(_sample_articles(n), config, out)
+        html = out.read_text(encoding="utf-8")
+        problems = renderer.check_budgets(html, config)
+        if not (out.with_name("digest.html.gz")).exists():
+            problems.append("no digest.html.gz written")
+        # What a consumer downloads instead of scraping the page
+        for name in ("digest.json", "digest.ndjson"):
+            data = (pathlib.Path(tmp) / name).read_bytes()
+            print(f"{name:<14} {len(data) / 1024:.1f} KB → gzip {len(gzip.compress(data)) / 1024:.1f} KB")
+    print(f"{n} articles: {'OK' if not problems else 'FAIL'}")
+    return not problems
+
+
+def bench_search(n):
+    import config
+    import search_index
+
+    rng = random.Random(0)
+    vocab = [f"{rng.choice('bcdfgklmnprstvz')}{rng.choice('aeiou')}{rng.choice('nrstlx')}{i}"
+             for i in range(5000)] + ["neuralink", "implant", "funding", "fda", "stimulation"]
+    articles = []
+    for i in range(n):
+        a = Article(" ".join(rng.choices(vocab, k=8)), "", f"https://example.com/{i}", SOURCES[i % len(SOURCES)])
+        a.one_line_summary = " ".join(rng.choices(vocab, k=15))
+        articles.append(a)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        out = pathlib.Path(tmp)
+        start = time.perf_counter()
+        search_index.update(articles, out, config)
+        build = time.perf_counter() - start
+        files = list(out.rglob("*.json"))
+        total = sum(f.stat().st_size for f in files)
+        shard_sizes = sorted(f.stat().st_size for f in (out / "idx").glob("*.json"))
+        print(f"{n} articles: built in {build:.2f}s, {len(files)} files, {total / 1e6:.1f} MB total, "
+              f"shards median {shard_sizes[len(shard_sizes) // 2] / 1024:.1f} KB / max {shard_sizes[-1] / 1024:.1f} KB")
+
+        # What the browser does for "neuralink fda": 1 manifest, 2 shards, hit chunks
+        start = time.perf_counter()
+        loaded = 0
+        manifest = json.loads((out / "manifest.json").read_text())
+        sets = []
+        for token in ("neuralink", "fda"):
+            raw = (out / "idx" / f"{token[:manifest['prefix']]}.json").read_bytes()
+            loaded += len(raw)
+            ids, acc = set(), 0
+            for i, d in enumerate(json.loads(raw).get(token, [])):
+                acc = d if i == 0 else acc + d
+                ids.add(acc)
+            sets.append(ids)
+        hits = sorted(set.intersection(*sets), reverse=True)[:50]
+        for chunk in {h // manifest["chunk"] for h in hits}:
+            loaded += (out / "docs" / f"{chunk}.json").stat().st_size
+        print(f"query 'neuralink fda': {len(hits)} hits, {loaded / 1024:.1f} KB loaded, "
+              f"{(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+def _full_article_summary(kb):
+    """A feed summary that embeds a whole article — the worst case we see."""
+    para = ("<p>Researchers at the lab reported that the implant&#8217;s 1,024 electrodes "
+            "recorded from motor cortex for 18 months &amp; decoded speech at 62 words "
+            "per minute.</p>\n")
+    block = ('<figure><img src="https://cdn.example.com/img/hero.jpg" srcset="a.jpg 1x, b.jpg 2x" '
+             'alt="A brain implant"><figcaption>The device.</figcaption></figure>\n'
+             '<script type="text/javascript">window.dataLayer=window.dataLayer||[];'
+             'function gtag(){dataLayer.push(arguments)}' + "x" * 2000 + '</script>\n'
+             '<style>.ad{display:none}' + "y" * 1000 + '</style>\n' + para * 20)
+    out = []
+    while sum(map(len, out)) < kb * 1024:
+        out.append(block)
+    return "".join(out)
+
+
+def bench_clean(runs):
+    import fetchers
+
+    def old(text):
+        return re.sub(r"<[^>]+>", " ", text).strip()[:500]
+
+    teaser = ("Researchers at the lab reported that the implant recorded from motor cortex "
+              "for 18 months and decoded speech at 62 words per minute.")
+    samples = [("plain", teaser), ("teaser", f'<p>{teaser}</p><p><a href="https://example.com/">Read more</a></p>')]
+    samples += [(f"{kb} KB", _full_article_summary(kb)) for kb in (5, 50, 300, 1000)]
+    print(f"{'summary':>10} {'old regex':>12} {'new cleaner':>12} {'speedup':>8}")
+    for label, text in samples:
+        runs_here = runs * 1000 if len(text) < 1024 else runs
+        timings = []
+        for fn in (old, lambda t: fetchers._clean_html(t, fetchers.KEYWORD_SCAN_CHARS)[:fetchers.SUMMARY_CHARS]):
+            start = time.perf_counter()
+            for _ in range(runs_here):
+                fn(text)
+            timings.append((time.perf_counter() - start) / runs_here * 1000)
+        print(f"{label:>10} {timings[0]:>9.4f} ms {timings[1]:>9.4f} ms {timings[0] / timings[1]:>7.1f}x")
+
+    sample = _full_article_summary(50)
+    print(f"\nold: {old(sample)[:120]!r}")
+    print(f"new: {fetchers._clean_html(sample)[:120]!r}")
+
+
+PROMPT_FIXTURE = [
+    ("STAT", "FDA clears first fully implantable brain-computer interface for paralysis",
+     "https://www.statnews.com/2026/10/14/fda-clears-implantable-bci-paralysis/"),
+    ("MIT Technology Review", "A new foundation model decodes inner speech from cortical recordings",
+     "https://www.technologyreview.com/2026/10/14/1100001/foundation-model-inner-speech-decoding/"),
+    ("IEEE Spectrum", "Ultrasound neuromodulation startup raises $48M Series B",
+     "https://spectrum.ieee.org/ultrasound-neuromodulation-series-b-funding"),
+    ("Hacker News", "Show HN: An open-source toolkit for spike sorting on the GPU",
+     "https://github.com/example/gpu-spike-sorting"),
+    ("TechCrunch", "Anthropic ships a faster small model aimed at coding agents",
+     "https://techcrunch.com/2026/10/14/anthropic-faster-small-model-coding-agents/"),
+    ("STAT", "EU regulators publish draft guidance on neural data privacy",
+     "https://www.statnews.com/2026/10/14/eu-draft-guidance-neural-data-privacy/"),
+]
+
+
+def _prompt_fixture(n):
+    """`n` articles shaped like a real morning: full URLs and 500-char summaries."""
+    rng = random.Random(1)
+    words = ("the researchers said implant electrodes patients trial cortex signals decoder model "
+             "company funding device clinical study data results team speech motor neural").split()
+    articles = []
+    for i in range(n):
+        source, title, url = PROMPT_FIXTURE[i % len(PROMPT_FIXTURE)]
+        summary = " ".join(rng.choices(words, k=120))[:500]
+        articles.append(Article(f"{title} ({i})", summary, f"{url}?utm_source=rss&id={i}", source))
+    return articles
+
+
+def bench_prompt(n, min_reduction):
+    import config
+    import llm
+
+    articles = _prompt_fixture(n)
+    # What _build_prompt sent before the compact encoding
+    old = json.dumps([{"title": a.title, "summary": a.summary, "url": a.url, "source": a.source}
+                      for a in articles], indent=2)
+    new = llm._build_prompt(articles, config)[len(llm.USER_INSTRUCTIONS):]
+    old_tokens, new_tokens = llm.estimate_tokens(old), llm.estimate_tokens(new)
+    reduction = 1 - new_tokens / old_tokens
+    print(f"{n} articles: JSON ~{old_tokens} tokens → compact ~{new_tokens} tokens ({reduction:.0%} fewer)")
+    ok = reduction >= min_reduction
+    if not ok:
+        print(f"  FAIL: expected at least {min_reduction:.0%} fewer tokens")
+
+    # The budget holds however many articles a batch carries
+    budget = getattr(config, "LLM_PROMPT_TOKEN_BUDGET", 6000)
+    many = llm._build_prompt(_prompt_fixture(n * 5), config)[len(llm.USER_INSTRUCTIONS):]
+    if llm.estimate_tokens(many) > budget:
+        print(f"  FAIL: {n * 5} articles came to ~{llm.estimate_tokens(many)} tokens, over the {budget} budget")
+        ok = False
+    return ok
+
+
+def bench_lazy():
+    """Page bytes and inline cards for growing article counts, full page vs
+    chunked mode — the chunked page should stay the same size."""
+    import config
+    import renderer
+
+    print(f"{'articles':>9} {'full page':>18} {'chunked page':>18} {'chunk files':>12}")
+    for n in (60, 600, 6000):
+        row = []
+        with tempfile.TemporaryDirectory() as tmp:
+            out = pathlib.Path(tmp) / "digest.html"
+            for chunked in (False, True):
+                config.CHUNKED_OUTPUT = chunked
+                with contextlib.redirect_stdout(io.StringIO()):
+                    renderer.render(_sample_articles(n), config, out)
+                html = out.read_text(encoding="utf-8")
+                cards = len(re.findall(r'<a class="card" href="[^\']', html))
+                row.append(f"{len(html.encode()) / 1024:>7.0f} KB {cards:>5} cards")
+            files = len(list((out.parent / config.CHUNK_DIR).rglob("*.json")))
+        config.CHUNKED_OUTPUT = False
+        print(f"{n:>9} {row[0]:>18} {row[1]:>18} {files:>12}")
+
+
+def _synthetic_feed(feed, entries):
+    items = "".join(
+        f"<item><title>Neural implant study {feed}-{i}</title>"
+        f"<link>https://example.com/{feed}/{i}</link>"
+        f"<description>{'&lt;p&gt;Brain-computer interface trial results. &lt;/p&gt;' * 12}</description></item>"
+        for i in range(entries))
+    return f"<?xml version='1.0'?><rss version='2.0'><channel><title>Feed {feed}</title>{items}</channel></rss>".encode()
+
+
+def bench_stream(entries):
+    """Peak memory of the fetch stage as the feed count grows: the list API
+    holds every article, the stream holds one feed plus the dedup set."""
+    import types
+
+    import fetchers
+    import resilience
+
+    def fake_get(url, kind, config, **kwargs):
+        return types.SimpleNamespace(content=_synthetic_feed(url.rsplit("/", 1)[1], entries),
+                                     url=url, headers={"Content-Type": "application/rss+xml"})
+
+    real_get, resilience.get = resilience.get, fake_get
+    print(f"{'feeds':>6} {'list':>10} {'stream':>10}")
+    try:
+        fetchers._import_feedparser()  # keep its import out of the first measurement
+        for feeds in (4, 16, 64):
+            cfg = types.SimpleNamespace(
+                SOURCE="rss", RSS_FEEDS=[f"https://feeds.example.com/{i}" for i in range(feeds)],
+                RSS_KEYWORDS=["neural"], RSS_DAYS_BACK=1, MAX_ARTICLES_IN_DIGEST=10 ** 9)
+            peaks = []
+            for consume in (fetchers.fetch_articles, lambda c: sum(1 for _ in fetchers.iter_articles(c))):
+                gc.collect()
+                tracemalloc.start()
+                result = consume(cfg)
+                peaks.append(tracemalloc.get_traced_memory()[1])
+                tracemalloc.stop()
+                del result
+            print(f"{feeds:>6} {peaks[0] / 1e6:>7.1f} MB {peaks[1] / 1e6:>7.1f} MB")
+    finally:
+        resilience.get = real_get
+
+
+def bench_store(n):
+    import datetime
+    import types
+
+    import store
+
+    rng = random.Random(2)
+    categories = ["approval", "funding", "research", "neuro_ai", "product", "ai_tool", "policy", "other"]
+    keywords = ["bci", "implant", "neural", "eeg", "neuralink", "fda", "llm", "agent", "startup", "brain"]
+    first = datetime.date.today() - datetime.timedelta(days=5 * 365)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cfg = types.SimpleNamespace(HISTORY_DB=str(pathlib.Path(tmp) / "history.db"), RSS_KEYWORDS=keywords)
+        start = time.perf_counter()
+        # One save() per day, as the daily runs would have done
+        per_day = max(1, n // (5 * 365))
+        for day in range(-(-n // per_day)):
+            batch = []
+            for i in range(per_day):
+                a = Article(f"Article {day}-{i} on {' '.join(rng.sample(keywords, 2))}", "",
+                            f"https://example.com/{day}/{i}?utm_source=rss", SOURCES[i % len(SOURCES)])
+                a.category = rng.choice(categories)
+                batch.append(a)
+            with contextlib.redirect_stdout(io.StringIO()):
+                store.save(batch, cfg, day=(first + datetime.timedelta(days=day)).isoformat())
+        print(f"{n} articles over 5 years: stored in {time.perf_counter() - start:.1f}s, "
+              f"{pathlib.Path(cfg.HISTORY_DB).stat().st_size / 1e6:.1f} MB")
+
+        quarter = (datetime.date.today() - datetime.timedelta(days=91)).isoformat()
+        queries = [
+            ("bci funding per week, last quarter",
+             lambda c: store.trend(c, "week", category="funding", keyword="bci", since=quarter)),
+            ("all articles per month, 5 years", lambda c: store.trend(c, "month")),
+            ("funding per year", lambda c: store.trend(c, "year", category="funding")),
+            ("top sources for 'implant'", lambda c: store.top(c, "source", keyword="implant")),
+            ("top keywords, last quarter", lambda c: store.top(c, "keyword", since=quarter)),
+        ]
+        conn = store.connect(cfg)
+        for label, query in queries:
+            start = time.perf_counter()
+            rows = query(conn)
+            print(f"  {label:<36} {len(rows):>4} rows {(time.perf_counter() - start) * 1000:>8.2f} ms")
+        conn.close()
+
+
+class _BatchStandIn(BaseHTTPRequestHandler):
+    """Just enough of Anthropic's Messages and Message Batches and OpenAI's
+    Batch/Files endpoints for llm._call_claude and batch.py. Batches finish
+    after a few status checks; every tenth article is judged irrelevant."""
+    protocol_version = "HTTP/1.1"
+    batches = {}
+    files = {}
+    calls = {}
+    messages = []   # request bodies sent to /v1/messages
+    checks_until_done = 3
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.path == "/v1/messages":
+            params = json.loads(body)
+            self.messages.append(params)
+            prompt = self._prompt_text(params)
+            return self._reply({
+                "id": "msg", "type": "message", "role": "assistant", "model": params["model"],
+                "content": [{"type": "text", "text": self._verdicts(prompt)}], "stop_reason": "end_turn",
+                "usage": {"input_tokens": len(body) // 4, "output_tokens": 300}})
+        if self.path == "/v1/messages/batches":
+            requests = json.loads(body)["requests"]
+            return self._reply(self._new_batch("msgbatch", [
+                (r["custom_id"], self._prompt_text(r["params"]))
+                for r in requests]))
+        if self.path == "/v1/files":
+            # The JSONL is the only part of the multipart body with custom_ids in it
+            lines = [json.loads(line) for line in re.split(rb"\r?\n", body) if line.startswith(b'{"custom_id"')]
+            file_id = f"file-{len(self.files)}"
+            self.files[file_id] = [(r["custom_id"], r["body"]["messages"][1]["content"]) for r in lines]
+            return self._reply({"id": file_id, "object": "file", "bytes": len(body), "created_at": 0,
+                                "filename": "requests.jsonl", "purpose": "batch", "status": "processed"})
+        if self.path == "/v1/batches":
+            return self._reply(self._new_batch("batch", self.files[json.loads(body)["input_file_id"]]))
+        self._reply({"error": "not found"}, 404)
+
+    def do_GET(self):
+        parts = self.path.strip("/").split("/")
+        batch_id = parts[3] if parts[1:2] == ["messages"] else parts[2]
+        if parts[1:2] in (["messages"], ["batches"]) and batch_id not in self.batches:
+            return self._reply({"type": "error", "error": {"type": "not_found_error", "message": "batch not found"}}, 404)
+        if parts[:3] == ["v1", "messages", "batches"]:
+            batch = self.batches[parts[3]]
+            if parts[4:] == ["results"]:
+                return self._reply_lines([{"custom_id": cid, "result": {"type": "succeeded", "message": {
+                    "id": "msg", "type": "message", "role": "assistant", "model": "m",
+                    "content": [{"type": "text", "text": answer}], "stop_reason": "end_turn",
+                    "usage": {"input_tokens": 1000, "output_tokens": 300}}}} for cid, answer in batch["answers"]])
+            done = self._check(batch)
+            n = len(batch["answers"])
+            return self._reply({
+                "id": batch["id"], "type": "message_batch", "created_at": "2026-01-01T00:00:00Z",
+                "expires_at": "2026-01-02T00:00:00Z", "processing_status": "ended" if done else "in_progress",
+                "request_counts": {"processing": 0 if done else n, "succeeded": n if done else 0,
+                                   "errored": 0, "canceled": 0, "expired": 0},
+                "results_url": f"http://{self.headers['Host']}/v1/messages/batches/{batch['id']}/results"
+                               if done else None})
+        if parts[:2] == ["v1", "batches"]:
+            batch = self.batches[parts[2]]
+            done = self._check(batch)
+            n = len(batch["answers"])
+            return self._reply({
+                "id": batch["id"], "object": "batch", "endpoint": "/v1/chat/completions",
+                "input_file_id": "file", "completion_window": "24h", "created_at": 0,
+                "status": "completed" if done else "in_progress",
+                "output_file_id": f"out-{batch['id']}" if done else None, "error_file_id": None,
+                "request_counts": {"total": n, "completed": n if done else 0, "failed": 0}})
+        if parts[:2] == ["v1", "files"] and parts[3:] == ["content"]:
+            batch = self.batches[parts[2][len("out-"):]]
+            return self._reply_lines([{"custom_id": cid, "error": None, "response": {"status_code": 200, "body": {
+                "choices": [{"message": {"role": "assistant", "content": json.dumps({"articles": json.loads(answer)})}}],
+                "usage": {"prompt_tokens": 1000, "completion_tokens": 300}}}} for cid, answer in batch["answers"]])
+        self._reply({"error": "not found"}, 404)
+
+    def _new_batch(self, prefix, prompts):
+        batch_id = f"{prefix}_{len(self.batches)}"
+        answers = [(custom_id, self._verdicts(prompt)) for custom_id, prompt in prompts]
+        self.batches[batch_id] = {"id": batch_id, "answers": answers, "checks": 0}
+        return {"id": batch_id, "type": "message_batch", "object": "batch", "processing_status": "in_progress",
+                "status": "validating", "request_counts": None}
+
+    @staticmethod
+    def _prompt_text(params):
+        content = params["messages"][0]["content"]
+        return content if isinstance(content, str) else " ".join(part["text"] for part in content)
+
+    @staticmethod
+    def _verdicts(prompt):
+        ids = re.findall(r"^(\d+)\. \[", prompt, re.M)
+        return json.dumps([{"id": int(i), "category": "research", "one_line_summary": f"Verdict {i}"}
+                           for i in ids if int(i) % 10])
+
+    def _check(self, batch):
+        batch["checks"] += 1
+        return batch["checks"] > self.checks_until_done
+
+    def _reply(self, obj, code=200):
+        self._send(json.dumps(obj).encode(), "application/json", code)
+
+    def _reply_lines(self, objs):
+        self._send("".join(json.dumps(o) + "\n" for o in objs).encode(), "application/binary")
+
+    def _send(self, data, content_type, code=200):
+        path = re.sub(r"_\d+|-\d+", "", self.path.split("?")[0])
+        key = f"{self.command} {path}"
+        _BatchStandIn.calls[key] = _BatchStandIn.calls.get(key, 0) + 1
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def bench_claude(n):
+    """llm._call_claude against the stand-in: the verdicts come back through
+    the anthropic client, and the cache breakpoint is sent only when the
+    static prefix reaches CLAUDE_CACHE_MIN_TOKENS."""
+    import types
+
+    import config
+    import llm
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _BatchStandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    prefix = llm.estimate_tokens(llm.SYSTEM_PROMPT + llm.USER_INSTRUCTIONS)
+    minimum = getattr(config, "CLAUDE_CACHE_MIN_TOKENS", 4096)
+    print(f"static prefix ~{prefix} tokens; {config.CLAUDE_MODEL} caches from {minimum}")
+
+    ok = True
+    # The configured minimum, then one the prefix clears
+    for label, min_tokens in (("configured", minimum), ("min 0", 0)):
+        cfg = types.SimpleNamespace(CLAUDE_API_KEY="k", CLAUDE_MODEL=config.CLAUDE_MODEL,
+                                    CLAUDE_BASE_URL=f"http://127.0.0.1:{server.server_address[1]}",
+                                    CLAUDE_CACHE_MIN_TOKENS=min_tokens)
+        llm._claude_client = None
+        _BatchStandIn.messages.clear()
+        articles = [Article(a.title, a.summary, a.url, a.source) for a in _sample_articles(n)]
+        with contextlib.redirect_stdout(io.StringIO()):
+            raw = llm._call_claude(llm._build_prompt(articles, cfg), cfg)
+        kept = llm._apply_verdicts(articles, llm._parse_response(raw), "claude")
+        content = _BatchStandIn.messages[0]["messages"][0]["content"]
+        breakpoint = not isinstance(content, str) and any("cache_control" in part for part in content)
+        expected = prefix >= min_tokens
+        print(f"{label}: {len(kept)} of {n} articles kept, cache breakpoint "
+              f"{'sent' if breakpoint else 'not sent'} (expected {'sent' if expected else 'not sent'})")
+        ok &= len(kept) == n - n // 10 and breakpoint == expected
+    server.shutdown()
+    print("OK" if ok else "FAILED")
+    return ok
+
+
+def bench_batch(n):
+    import types
+
+    import batch
+    import llm
+    import store
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _BatchStandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        cfg = types.SimpleNamespace(
+            LLM_BACKEND="claude", CLAUDE_API_KEY="k", CLAUDE_MODEL="claude-haiku-4-5", CLAUDE_BASE_URL=base,
+            OPENAI_API_KEY="k", OPENAI_MODEL="gpt-4o-mini", OPENAI_BASE_URL=base + "/v1",
+            HISTORY_DB=str(pathlib.Path(tmp) / "history.db"), BATCH_STATE_FILE=str(pathlib.Path(tmp) / "batches.json"),
+            RSS_KEYWORDS=["bci"], BATCH_POLL_SECONDS=0.05, BATCH_POLL_MAX_SECONDS=0.2)
+        llm._claude_client = None
+        articles = [Article(a.title, a.summary, a.url, a.source) for a in _sample_articles(n)]
+
+        # New articles through Claude, then the whole history re-classified through OpenAI
+        for backend, label in (("claude", "classify new"), ("openai", "re-classify history")):
+            _BatchStandIn.calls.clear()
+            if backend == "openai":
+                conn = store.connect(cfg)
+                articles = store.load(conn)
+                conn.close()
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                batch.submit(articles, cfg, backend=backend)
+                left = batch.poll(cfg)   # reads the jobs back from the state file, as after a restart
+            elapsed = time.perf_counter() - start
+            conn = store.connect(cfg)
+            stored = conn.execute("SELECT count(*) FROM articles WHERE backend = ?", (backend,)).fetchone()[0]
+            conn.close()
+            requests = -(-len(articles) // 25)
+            print(f"{label} ({backend}): {len(articles)} articles in {requests} batch requests, "
+                  f"{sum(_BatchStandIn.calls.values())} HTTP calls "
+                  f"(vs {requests} interactive), {stored} merged into history, {elapsed:.2f}s")
+            for call, count in sorted(_BatchStandIn.calls.items()):
+                print(f"    {call:<40} {count}")
+            ok &= left == 0 and stored > 0 and not batch._load_state(cfg)["jobs"]
+    server.shutdown()
+    print("OK" if ok else "FAILED: jobs left pending or results not merged")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Neurotech digest benchmarks")
+    sub = parser.add_subparsers(dest="bench", required=True)
+    p = sub.add_parser("memory", help="Article records vs per-article dicts")
+    p.add_argument("-n", type=int, default=10_000)
+    p = sub.add_parser("startup", help="CLI import time + time to first network call")
+    p.add_argument("--budget-ms", type=float, default=100)
+    p = sub.add_parser("page", help="Production page size / render-blocking budgets")
+    p.add_argument("-n", type=int, default=60)
+    p = sub.add_parser("search", help="Search index build + per-query bytes/time")
+    p.add_argument("-n", type=int, default=30_000)
+    p = sub.add_parser("clean", help="Summary cleaner vs the old regex on big summaries")
+    p.add_argument("--runs", type=int, default=20)
+    p = sub.add_parser("prompt", help="Prompt tokens: compact encoding vs indented JSON")
+    p.add_argument("-n", type=int, default=40)
+    p.add_argument("--min-reduction", type=float, default=0.5)
+    p = sub.add_parser("stream", help="Fetch peak memory: list API vs streaming iterators")
+    p.add_argument("--entries", type=int, default=25, help="entries per feed")
+    p = sub.add_parser("lazy", help="Chunked page: HTML size / cards vs article count")
+    p = sub.add_parser("store", help="History DB: trend query times over years of articles")
+    p.add_argument("-n", type=int, default=200_000)
+    p = sub.add_parser("claude", help="Claude backend call + cache breakpoint against a local stand-in API")
+    p.add_argument("-n", type=int, default=40)
+    p = sub.add_parser("batch", help="Batch mode end to end against a local stand-in API")
+    p.add_argument("-n", type=int, default=2000)
+    args = parser.parse_args()
+
+    if args.bench == "memory":
+        bench_memory(args.n)
+    elif args.bench == "startup":
+        sys.exit(0 if bench_startup(args.budget_ms) else 1)
+    elif args.bench == "page":
+        sys.exit(0 if bench_page(args.n) else 1)
+    elif args.bench == "search":
+        bench_search(args.n)
+    elif args.bench == "clean":
+        bench_clean(args.runs)
+    elif args.bench == "prompt":
+        sys.exit(0 if bench_prompt(args.n, args.min_reduction) else 1)
+    elif args.bench == "stream":
+        bench_stream(args.entries)
+    elif args.bench == "lazy":
+        bench_lazy()
+    elif args.bench == "store":
+        bench_store(args.n)
+    elif args.bench == "claude":
+        sys.exit(0 if bench_claude(args.n) else 1)
+    elif args.bench == "batch":
+        sys.exit(0 if bench_batch(args.n) else 1)
+
+
+if __name__ == "__main__":
+    main()
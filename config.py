@@ -3,6 +3,7 @@
 #  Edit this file to switch data sources, add API keys, etc.
 #  API keys are loaded from a local .env file (never uploaded to GitHub).
 # ============================================================
+import functools
 import os
 from pathlib import Path
 
@@ -18,7 +19,21 @@ def _load_env():
         value = value.strip().strip("\"'")
         os.environ.setdefault(key.strip(), value)
 
-_load_env()
+# Settings below that come from the environment; load() re-reads them once
+# .env has been merged in.
+_ENV_SETTINGS = ("CLAUDE_API_KEY", "CLAUDE_BASE_URL", "OPENAI_API_KEY", "OPENAI_BASE_URL",
+                 "GOOGLE_API_KEY", "GOOGLE_CSE_ID")
+
+@functools.cache
+def load():
+    """Merge .env into the environment and fill any blank key settings from
+    it. Called explicitly by run.py rather than at import, so importing
+    config stays cheap; cached, so calling it again is free."""
+    _load_env()
+    settings = globals()
+    for name in _ENV_SETTINGS:
+        if not settings[name]:
+            settings[name] = os.environ.get(name, "")
 
 # ----- DATA SOURCE -----
 # Options: "rss" | "hn" | "rss+hn" | "google" | "bing"
@@ -28,16 +43,40 @@ SOURCE = "rss"
 # ----- LLM BACKEND -----
 # Options: "ollama" | "claude" | "openai"
 LLM_BACKEND = "claude"
+# Optional failover chain, tried in order (overrides LLM_BACKEND when set),
+# e.g. ["ollama", "claude"] — free local model first, cloud if it's down/slow.
+LLM_BACKENDS = []
+LLM_TIMEOUTS = {"ollama": 600, "claude": 120, "openai": 120}  # seconds per backend
+# If the current backend hasn't answered after this many seconds, also send
+# the batch to the next one and use whichever answers first. None = off.
+LLM_HEDGE_AFTER = None
+# Articles go to the model as numbered one-line entries without URLs. Each
+# summary is cut to LLM_SUMMARY_CHARS, and further if needed so the article
+# list of one request fits LLM_PROMPT_TOKEN_BUDGET (estimated, ~4 chars/token).
+LLM_SUMMARY_CHARS = 240
+LLM_PROMPT_TOKEN_BUDGET = 6000
 OLLAMA_MODEL = "llama3.2"
 OLLAMA_BASE_URL = "http://localhost:11434"
+OLLAMA_KEEP_ALIVE = "30m"      # keep the model loaded between calls/runs
+OLLAMA_NUM_PARALLEL = 1        # match the server's OLLAMA_NUM_PARALLEL slots
+OLLAMA_CONNECT_TIMEOUT = 5     # seconds
+OLLAMA_READ_TIMEOUT = 300      # max seconds between streamed chunks (covers prompt eval)
 
 # Claude API (~$0.30/month at Haiku prices)
 CLAUDE_API_KEY = os.environ.get("CLAUDE_API_KEY", "")  # set via env var or paste here for local use
 CLAUDE_MODEL = "claude-haiku-4-5-20251001"
+CLAUDE_BASE_URL = os.environ.get("CLAUDE_BASE_URL", "")  # blank = api.anthropic.com; point at a local mock for testing
+# Minimum cacheable prompt length of CLAUDE_MODEL, in tokens: 4096 for Haiku
+# 4.5 and Opus 4.5, 2048 for Haiku 3.x, 1024 for the Sonnet models. The
+# static prefix (system prompt + instructions, ~510 tokens) is only marked
+# for the prompt cache once it reaches this, since a shorter one is never
+# cached. With the default prompts and Haiku 4.5 no call is cached.
+CLAUDE_CACHE_MIN_TOKENS = 4096
 
 # OpenAI
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "")
 OPENAI_MODEL = "gpt-4o-mini"
+OPENAI_BASE_URL = os.environ.get("OPENAI_BASE_URL", "")  # blank = api.openai.com; point at a local mock for testing
 
 # ----- GOOGLE CUSTOM SEARCH -----
 GOOGLE_API_KEY = os.environ.get("GOOGLE_API_KEY", "")
@@ -53,6 +92,7 @@ GOOGLE_RESULTS_PER_QUERY = 5
 
 
 # ----- RSS FEEDS -----
+# Listed in priority order: under a --deadline the last ones are cut first.
 RSS_FEEDS = [
     # Neurotech specific
     "https://www.neurotechreports.com/pages/feed.html",
@@ -100,6 +140,26 @@ HN_QUERIES = [
     "precision neuroscience",
 ]
 
+# ----- FETCH RESILIENCE -----
+# (connect, read, total) seconds per attempt. Looked up by host first, then
+# by source kind ("rss", "hn", "google", "bing"), then "default".
+FETCH_TIMEOUTS = {
+    "default": (3.05, 10, 20),
+    "rss": (3.05, 10, 15),
+}
+FETCH_RETRIES = 2              # extra attempts on connection errors, timeouts, 429/5xx
+FETCH_BACKOFF = 0.5            # first retry delay (s); doubles each time, with jitter
+FETCH_BACKOFF_MAX = 4.0
+FETCH_RETRY_BUDGET = 20        # total retries per run across all sources
+# Known-slow hosts: send a duplicate request after this many seconds and use
+# whichever answers first, e.g. {"www.nature.com": 3.0}
+FETCH_HEDGE_HOSTS = {}
+# Circuit breaker: after this many consecutive failures a feed is skipped
+# until the cool-down ends. State persists in FETCH_BREAKER_FILE.
+FETCH_BREAKER_THRESHOLD = 3
+FETCH_BREAKER_COOLDOWN_HOURS = 6
+FETCH_BREAKER_FILE = ".fetch_breaker.json"
+
 # ----- RSS KEYWORD FILTER -----
 RSS_KEYWORDS = [
     # Core neurotech
@@ -174,3 +234,90 @@ RSS_KEYWORDS = [
 # ----- OUTPUT -----
 OUTPUT_FILE = "digest.html"
 MAX_ARTICLES_IN_DIGEST = 60
+SITE_URL = "https://chichi-chang.github.io/daily_neurotech_ai"
+
+# Machine-readable copies of each page's articles, written in the same render
+# pass: digest.json (JSON Feed 1.1) and digest.ndjson (one article per line),
+# published as index.json / index.ndjson by --deploy.
+FEED_OUTPUT = True
+
+# Production page (or: python run.py --production): no web fonts, minified
+# inline CSS/HTML, plus digest.html.gz / .br for static hosts.
+PRODUCTION_OUTPUT = False
+HTML_GZIP_BUDGET_KB = 30       # warn if the gzipped page is bigger
+RENDER_BLOCKING_BUDGET = 0     # external stylesheets / sync scripts allowed
+
+# Archive search box: every run adds its articles to a sharded index in
+# SEARCH_INDEX_DIR (next to OUTPUT_FILE) that the page loads on demand.
+# Needs the page served over HTTP (GitHub Pages, python -m http.server).
+SEARCH_INDEX = False
+SEARCH_INDEX_DIR = "search"
+SEARCH_DOCS_PER_CHUNK = 500
+
+# ----- DIGEST PROFILES -----
+# Build several digests from ONE fetch + ONE LLM pass. Each profile picks its
+# articles from the shared results by keywords (None = any) and LLM category
+# (None = any), with its own output file and limit. The first profile is the
+# one published as index.html by --deploy. Empty = the single digest above.
+PROFILES = {}
+# PROFILES = {
+#     "combined":  {"output_file": "digest.html"},
+#     "neurotech": {"categories": ["approval", "funding", "research", "neuro_ai", "product", "policy"],
+#                   "output_file": "neurotech.html", "max_articles": 40},
+#     "ai_tools":  {"keywords": ["ai", "llm", "model", "agent", "openai", "anthropic", "gemini"],
+#                   "categories": ["ai_tool", "neuro_ai", "funding", "product"],
+#                   "output_file": "ai_tools.html", "max_articles": 40},
+# }
+
+# ----- METRICS -----
+# Each run (not --fetch-only) writes stage durations, per-feed article and
+# error counts, HTTP bytes, LLM tokens / cache hits and article counts here as
+# an OpenMetrics textfile. For node_exporter, point this at a file in its
+# --collector.textfile.directory. "" = off.
+METRICS_FILE = "digest.prom"
+
+# ----- CHUNKED PAGE (python run.py --chunked) -----
+# For multi-day / archive pages with thousands of cards: only the first
+# CHUNK_FIRST_SCREEN cards of each category are in the HTML; the rest are
+# written to CHUNK_DIR/<page name>/<category>-<n>.json (CHUNK_SIZE cards
+# each) and loaded as the reader scrolls or picks a filter. Needs the page
+# served over http(s) (GitHub Pages, or python -m http.server locally).
+CHUNKED_OUTPUT = False
+CHUNK_FIRST_SCREEN = 12
+CHUNK_SIZE = 50
+CHUNK_DIR = "chunks"
+
+# ----- HISTORY (python run.py trends) -----
+# Every analyzed article is added to this SQLite file with its date, source,
+# category, matched keywords and canonical URL.
+HISTORY = True
+HISTORY_DB = "history.db"
+
+# ----- BATCH MODE (python run.py batch ...) -----
+# Bulk classification through the Claude / OpenAI batch APIs (about half the
+# price, results within 24h). Submitted jobs are kept in BATCH_STATE_FILE
+# until their results have been merged into HISTORY_DB.
+BATCH_STATE_FILE = "batches.json"
+BATCH_ARTICLES_PER_REQUEST = 25
+BATCH_MAX_REQUESTS = 10000     # per submitted batch; more are split into several
+BATCH_POLL_SECONDS = 30        # first wait between status checks, doubled each time
+BATCH_POLL_MAX_SECONDS = 900
+BATCH_MAX_ATTEMPTS = 3         # submissions per article before its request is left failed
+
+# ----- DEADLINE (python run.py --deadline 07:55) -----
+# Share of the time until the deadline each stage may use, in stage order;
+# what a stage leaves unused rolls over to the next.
+DEADLINE_BUDGETS = {"fetch": 0.4, "llm": 0.4, "render": 0.1, "deploy": 0.1}
+# Rough seconds of backend time per article, used to decide how many articles
+# the LLM can take before its cut-off (the rest are categorized by keywords).
+LLM_SECONDS_PER_ARTICLE = {"ollama": 1.5, "claude": 0.15, "openai": 0.15}
+
+# ----- PIPELINED MODE (python run.py --pipeline) -----
+# Fetching and LLM analysis overlap: a batch goes to the LLM as soon as it has
+# LLM_BATCH_SIZE articles or LLM_BATCH_FLUSH_SECONDS have passed since its
+# first article arrived. The page is rendered once every batch is in.
+FETCH_WORKERS = 8            # feeds/queries fetched concurrently
+PIPELINE_QUEUE_SIZE = 100    # max fetched articles waiting for the LLM
+LLM_BATCH_SIZE = 20
+LLM_BATCH_FLUSH_SECONDS = 5.0
+LLM_WORKERS = 4              # concurrent LLM calls (cloud backends)
@@ -0,0 +1,76 @@
+"""
+deadline.py — Run-wide time budget for `run.py --deadline`.
+
+The run gets one end time, split into stage budgets (DEADLINE_BUDGETS —
+fractions of the total, used in order, with time a stage doesn't need
+rolling over to the next). A stage asks for its cut-off with stage_end()
+and degrades instead of overrunning it:
+
+  fetch   stops waiting on sources still running at the cut-off; sources are
+          started in config order, so the ones listed last are cut first
+  llm     sends only as many articles as the backend can get through in time
+          and categorizes the rest by keywords; a backend that hasn't answered
+          by the cut-off is abandoned in favour of keywords too
+  deploy  the git push is killed at the deadline
+
+Each degradation is recorded with note(); the renderer shows the notes on
+the page so readers know what they're looking at.
+"""
+
+import datetime
+import re
+import sys
+import time
+
+_start = None
+_total = None
+notes = []
+
+
+def parse(value):
+    """Seconds from now until `value`: a number of seconds ("900") or a
+    clock time today ("07:55")."""
+    if re.fullmatch(r"\d+(\.\d+)?", value):
+        return float(value)
+    m = re.fullmatch(r"(\d{1,2}):(\d{2})", value)
+    if not m:
+        sys.exit(f"--deadline must be seconds (e.g. 900) or a time today (e.g. 07:55), not '{value}'")
+    now = datetime.datetime.now()
+    end = now.replace(hour=int(m.group(1)), minute=int(m.group(2)), second=0, microsecond=0)
+    if end <= now:
+        sys.exit(f"--deadline {value} has already passed")
+    return (end - now).total_seconds()
+
+
+def start(seconds):
+    global _start, _total
+    _start, _total = time.monotonic(), seconds
+    print(f"[deadline] {seconds:.0f}s to publish")
+
+
+def active():
+    return _start is not None
+
+
+def stage_end(stage, config):
+    """Monotonic time by which `stage` has to be done, or None without a
+    deadline."""
+    if not active():
+        return None
+    budgets = getattr(config, "DEADLINE_BUDGETS", {"fetch": 0.4, "llm": 0.4, "render": 0.1, "deploy": 0.1})
+    share = 0.0
+    for name, fraction in budgets.items():
+        share += fraction
+        if name == stage:
+            break
+    return _start + _total * min(share, 1.0)
+
+
+def remaining():
+    """Seconds left until the deadline (None without one)."""
+    return None if not active() else max(0.0, _start + _total - time.monotonic())
+
+
+def note(message):
+    print(f"[deadline] Degraded: {message}")
+    notes.append(message)
@@ -4,11 +4,20 @@ Switch source via config.py — no code changes needed.
 """
 
 import datetime
+import functools
+import html
+import itertools
 import re
 import sys
+import time
 
+import deadline
+import metrics
+import resilience
+from article import Article
 
-def _matches_keywords(text, keywords):
+
+def matches_keywords(text, keywords):
     """Check if text matches any keyword. Uses word-boundary matching for
     short keywords (<=3 chars) to avoid false positives like 'ai' in 'brain'."""
     text_lower = text.lower()
@@ -21,100 +30,243 @@ def _matches_keywords(text, keywords):
                 return True
     return False
 
+
+def matched_keywords(text, keywords):
+    """The keywords that matches_keywords would accept `text` for."""
+    text_lower = text.lower()
+    return [kw for kw in keywords
+            if (re.search(r'\b' + re.escape(kw) + r'\b', text_lower) if len(kw) <= 3 else kw in text_lower)]
+
+
 def fetch_articles(config):
+    """All of iter_articles() as a list."""
+    return list(iter_articles(config))
+
+
+def iter_articles(config, workers=1, until=None):
+    """Yield the configured source's articles as feeds are parsed — deduped
+    by URL and capped at MAX_ARTICLES_IN_DIGEST. Only one feed's entries are
+    held at a time, and once the cap is reached no further feeds are fetched.
+    With workers > 1 the sources are fetched concurrently and articles come
+    out in arrival order; each article's `rank` is its source's position in
+    config order either way.
+
+    Sources start in config order. With `until` (a time.monotonic() value),
+    sources still running or not yet started at that point are cut."""
     source = config.SOURCE
     print(f"[fetch] Using source: {source}")
 
-    if source == "rss":
-        return fetch_rss(config)
-    elif source == "google":
-        return fetch_google(config)
-    elif source == "bing":
-        return fetch_bing(config)
-    elif source == "hn":
-        return fetch_hn(config)
-    elif source == "rss+hn":
-        # Combine RSS and HN — best free option
-        rss = fetch_rss(config)
-        hn = fetch_hn(config)
-        seen = {a["url"] for a in rss}
-        combined = rss + [a for a in hn if a["url"] not in seen]
-        print(f"[fetch] Combined total: {len(combined)} articles")
-        return combined[:config.MAX_ARTICLES_IN_DIGEST]
+    jobs = fetch_jobs(config)
+    if workers > 1:
+        stream = _iter_concurrent(jobs, workers, until)
     else:
-        sys.exit(f"Unknown SOURCE '{source}' in config.py")
+        stream = _iter_sequential(jobs, until)
+
+    count = 0
+    for a in dedup(stream):
+        yield a
+        count += 1
+        if count >= config.MAX_ARTICLES_IN_DIGEST:
+            break
+    print(f"[fetch] Got {count} articles")
+
+
+def dedup(articles):
+    """Streaming stage: drop articles whose URL has already gone past."""
+    seen = set()
+    for a in articles:
+        if a.url not in seen:
+            seen.add(a.url)
+            yield a
+
+
+def keyword_filter(articles, keywords):
+    """Streaming stage: keep articles whose title or summary mentions a keyword."""
+    for a in articles:
+        if matches_keywords(a.title + " " + a.summary, keywords):
+            yield a
+
+
+def _iter_sequential(jobs, until):
+    for done, job in enumerate(jobs):
+        if until is not None and time.monotonic() >= until:
+            _cut(len(jobs) - done, len(jobs))
+            return
+        for a in job():
+            a.rank = done
+            yield a
+
+
+def _cut(cut, total):
+    deadline.note(f"fetch ran out of time — {cut} of {total} sources cut")
+
+
+_JOB_DONE = object()
+
+
+def _iter_concurrent(jobs, workers, until=None):
+    """Run the jobs on `workers` threads and yield their articles as they
+    arrive. The hand-off queue is bounded, so a fast feed waits for the
+    consumer instead of piling up in memory; closing the generator stops the
+    jobs. The threads are daemons, so a feed still hanging at the cut-off
+    doesn't hold the process open at exit (a ThreadPoolExecutor's would be
+    joined)."""
+    import queue
+    import threading
+
+    todo = queue.SimpleQueue()   # FIFO: jobs start in the order listed
+    for rank, job in enumerate(jobs):
+        todo.put((rank, job))
+    out = queue.Queue(maxsize=workers * 16)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                out.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def run(rank, job):
+        try:
+            for a in job():
+                a.rank = rank
+                if not put(a):
+                    return
+        except BaseException as e:
+            # Re-raised in the consumer (e.g. sys.exit for a missing API key)
+            put(e)
+        put(_JOB_DONE)
+
+    def worker():
+        while not stop.is_set():
+            try:
+                rank, job = todo.get_nowait()
+            except queue.Empty:
+                return
+            run(rank, job)
+
+    for _ in range(min(workers, len(jobs))):
+        threading.Thread(target=worker, daemon=True).start()
+    try:
+        remaining = len(jobs)
+        while remaining:
+            try:
+                item = out.get(timeout=None if until is None else max(0.0, until - time.monotonic()))
+            except queue.Empty:
+                _cut(remaining, len(jobs))
+                return
+            if item is _JOB_DONE:
+                remaining -= 1
+            elif isinstance(item, BaseException):
+                raise item
+            else:
+                yield item
+    finally:
+        stop.set()
 
 
 # ── RSS ──────────────────────────────────────────────────────────────────────
 
 def fetch_rss(config):
+    articles = list(itertools.islice(iter_rss(config), config.MAX_ARTICLES_IN_DIGEST))
+    print(f"[fetch] Got {len(articles)} articles from RSS")
+    return articles
+
+
+def iter_rss(config):
+    keywords, no_filter_feeds, all_feeds, cutoff = _rss_settings(config)
+    for url in all_feeds:
+        yield from _iter_feed(config, url, keywords, url not in no_filter_feeds, cutoff)
+
+
+def _import_feedparser():
     try:
         import feedparser
     except ImportError:
         sys.exit("feedparser not installed. Run: pip install feedparser")
+    return feedparser
 
+
+def _rss_settings(config):
     keywords = [k.lower() for k in config.RSS_KEYWORDS]
     no_filter_feeds = set(getattr(config, "RSS_FEEDS_NO_KEYWORD_FILTER", []))
-    all_feeds = list(config.RSS_FEEDS) + list(no_filter_feeds - set(config.RSS_FEEDS))
-    articles = []
+    all_feeds = list(config.RSS_FEEDS) + [
+        u for u in getattr(config, "RSS_FEEDS_NO_KEYWORD_FILTER", []) if u not in config.RSS_FEEDS
+    ]
     days_back = getattr(config, "RSS_DAYS_BACK", 1)
     cutoff = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=days_back)
+    return keywords, no_filter_feeds, all_feeds, cutoff
 
-    for url in all_feeds:
-        try:
-            feed = feedparser.parse(url)
-            for entry in feed.entries:
-                title = entry.get("title", "")
-                summary = entry.get("summary", "") or entry.get("description", "")
-                link = entry.get("link", "")
-
-                # Date check — only last 24h (gracefully skip if no date)
-                published = entry.get("published_parsed") or entry.get("updated_parsed")
-                if published:
-                    pub_dt = datetime.datetime(*published[:6], tzinfo=datetime.timezone.utc)
-                    if pub_dt < cutoff:
-                        continue
-
-                # Keyword filter (skip for pre-curated feeds)
-                if url not in no_filter_feeds:
-                    combined = title + " " + summary
-                    if not _matches_keywords(combined, keywords):
-                        continue
-
-                articles.append({
-                    "title": title.strip(),
-                    "summary": _clean_html(summary)[:500],
-                    "url": link,
-                    "source": feed.feed.get("title", url),
-                })
-
-                if len(articles) >= config.MAX_ARTICLES_IN_DIGEST:
-                    break
-        except Exception as e:
-            print(f"[rss] Failed to fetch {url}: {e}")
 
-    print(f"[fetch] Got {len(articles)} articles from RSS")
-    return articles
+def _iter_feed(config, url, keywords, keyword_filter_on, cutoff):
+    """Yield one feed's recent (and, unless it's pre-curated, on-topic) articles."""
+    articles = _iter_entries(config, url, cutoff)
+    if keyword_filter_on:
+        articles = keyword_filter(articles, keywords)
+    metrics.inc("feed_articles", 0, feed=url)   # a feed gone dark still shows up, as 0
+    try:
+        for a in articles:
+            # The keyword filter saw KEYWORD_SCAN_CHARS; keep SUMMARY_CHARS
+            a.summary = a.summary[:SUMMARY_CHARS]
+            metrics.inc("feed_articles", feed=url)
+            yield a
+    except resilience.CircuitOpen as e:
+        print(f"[rss] Skipping {url}: {e}")
+        metrics.inc("feed_errors", feed=url, reason="circuit_open")
+    except Exception as e:
+        print(f"[rss] Failed to fetch {url}: {e}")
+        metrics.inc("feed_errors", feed=url, reason="error")
+
+
+def _iter_entries(config, url, cutoff):
+    # Download through the resilience layer (timeouts, retries, circuit
+    # breaker) — feedparser's own fetching has no timeout at all.
+    resp = resilience.get(url, "rss", config)
+    feed = _import_feedparser().parse(resp.content, response_headers={
+        "content-location": resp.url,
+        "content-type": resp.headers.get("Content-Type", ""),
+    })
+    del resp
+    source = feed.feed.get("title", url)
+    for entry in feed.entries:
+        # Date check — only last 24h (gracefully skip if no date)
+        published = entry.get("published_parsed") or entry.get("updated_parsed")
+        pub_dt = None
+        if published:
+            pub_dt = datetime.datetime(*published[:6], tzinfo=datetime.timezone.utc)
+            if pub_dt < cutoff:
+                continue
+
+        # Clean first: some feeds put whole articles (images, scripts) in
+        # the summary, and we only ever look at the start of it
+        yield Article(
+            title=entry.get("title", "").strip(),
+            summary=_clean_html(entry.get("summary", "") or entry.get("description", ""), KEYWORD_SCAN_CHARS),
+            url=entry.get("link", ""),
+            source=source,
+            published=pub_dt,
+        )
 
 
 # ── GOOGLE CUSTOM SEARCH ─────────────────────────────────────────────────────
 
 def fetch_google(config):
-    try:
-        import requests
-    except ImportError:
-        sys.exit("requests not installed. Run: pip install requests")
+    articles = list(itertools.islice(dedup(iter_google(config)), config.MAX_ARTICLES_IN_DIGEST))
+    print(f"[fetch] Got {len(articles)} articles from Google")
+    return articles
+
 
+def iter_google(config):
     if not config.GOOGLE_API_KEY or not config.GOOGLE_CSE_ID:
         sys.exit("Set GOOGLE_API_KEY and GOOGLE_CSE_ID in config.py")
 
-    articles = []
-    seen_urls = set()
-
     for query in config.GOOGLE_QUERIES:
         try:
-            resp = requests.get(
-                "https://www.googleapis.com/customsearch/v1",
+            resp = resilience.get(
+                "https://www.googleapis.com/customsearch/v1", "google", config,
                 params={
                     "key": config.GOOGLE_API_KEY,
                     "cx": config.GOOGLE_CSE_ID,
@@ -122,47 +274,39 @@ def fetch_google(config):
                     "num": config.GOOGLE_RESULTS_PER_QUERY,
                     "dateRestrict": "d1",   # last 24 hours
                 },
-                timeout=10,
             )
-            resp.raise_for_status()
-            data = resp.json()
-
-            for item in data.get("items", []):
-                url = item.get("link", "")
-                if url in seen_urls:
-                    continue
-                seen_urls.add(url)
-                articles.append({
-                    "title": item.get("title", "").strip(),
-                    "summary": item.get("snippet", "").strip(),
-                    "url": url,
-                    "source": item.get("displayLink", ""),
-                })
+            items = resp.json().get("items", [])
         except Exception as e:
             print(f"[google] Query '{query}' failed: {e}")
-
-    print(f"[fetch] Got {len(articles)} articles from Google")
-    return articles[:config.MAX_ARTICLES_IN_DIGEST]
+            metrics.inc("feed_errors", feed=f"google:{query}", reason="error")
+            continue
+
+        metrics.inc("feed_articles", len(items), feed=f"google:{query}")
+        for item in items:
+            yield Article(
+                title=item.get("title", "").strip(),
+                summary=item.get("snippet", "").strip(),
+                url=item.get("link", ""),
+                source=item.get("displayLink", ""),
+            )
 
 
 # ── BING SEARCH ───────────────────────────────────────────────────────────────
 
 def fetch_bing(config):
-    try:
-        import requests
-    except ImportError:
-        sys.exit("requests not installed. Run: pip install requests")
+    articles = list(itertools.islice(dedup(iter_bing(config)), config.MAX_ARTICLES_IN_DIGEST))
+    print(f"[fetch] Got {len(articles)} articles from Bing")
+    return articles
+
 
+def iter_bing(config):
     if not config.BING_API_KEY:
         sys.exit("Set BING_API_KEY in config.py")
 
-    articles = []
-    seen_urls = set()
-
     for query in config.BING_QUERIES:
         try:
-            resp = requests.get(
-                "https://api.bing.microsoft.com/v7.0/news/search",
+            resp = resilience.get(
+                "https://api.bing.microsoft.com/v7.0/news/search", "bing", config,
                 headers={"Ocp-Apim-Subscription-Key": config.BING_API_KEY},
                 params={
                     "q": query,
@@ -170,27 +314,31 @@ def fetch_bing(config):
                     "freshness": "Day",
                     "mkt": "en-US",
                 },
-                timeout=10,
             )
-            resp.raise_for_status()
-            data = resp.json()
-
-            for item in data.get("value", []):
-                url = item.get("url", "")
-                if url in seen_urls:
-                    continue
-                seen_urls.add(url)
-                articles.append({
-                    "title": item.get("name", "").strip(),
-                    "summary": item.get("description", "").strip(),
-                    "url": url,
-                    "source": item.get("provider", [{}])[0].get("name", ""),
-                })
+            items = resp.json().get("value", [])
         except Exception as e:
             print(f"[bing] Query '{query}' failed: {e}")
+            metrics.inc("feed_errors", feed=f"bing:{query}", reason="error")
+            continue
+
+        metrics.inc("feed_articles", len(items), feed=f"bing:{query}")
+        for item in items:
+            yield Article(
+                title=item.get("name", "").strip(),
+                summary=item.get("description", "").strip(),
+                url=item.get("url", ""),
+                source=item.get("provider", [{}])[0].get("name", ""),
+                published=_parse_utc(item.get("datePublished")),
+            )
 
-    print(f"[fetch] Got {len(articles)} articles from Bing")
-    return articles[:config.MAX_ARTICLES_IN_DIGEST]
+
+def _parse_utc(text):
+    """Bing's "2026-10-19T05:12:00.0000000Z" as an aware datetime (None if
+    missing or unreadable)."""
+    try:
+        return datetime.datetime.fromisoformat(text[:19]).replace(tzinfo=datetime.timezone.utc)
+    except (TypeError, ValueError):
+        return None
 
 
 # ── HACKER NEWS (Algolia API — free, no key needed) ──────────────────────────
@@ -201,50 +349,130 @@ HN_QUERIES = [
 ]
 
 def fetch_hn(config):
-    try:
-        import requests
-    except ImportError:
-        sys.exit("requests not installed. Run: pip install requests")
+    articles = list(itertools.islice(dedup(iter_hn(config)), config.MAX_ARTICLES_IN_DIGEST))
+    print(f"[fetch] Got {len(articles)} articles from Hacker News")
+    return articles
+
+
+def iter_hn(config):
+    cutoff_ts, hn_queries = _hn_settings(config)
+    for query in hn_queries:
+        yield from _iter_hn_query(config, query, cutoff_ts)
 
+
+def _hn_settings(config):
     days_back = getattr(config, "RSS_DAYS_BACK", 1)
     cutoff_ts = int((datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=days_back)).timestamp())
-    hn_queries = getattr(config, "HN_QUERIES", HN_QUERIES)
+    return cutoff_ts, getattr(config, "HN_QUERIES", HN_QUERIES)
 
-    articles = []
-    seen_urls = set()
 
-    for query in hn_queries:
-        try:
-            resp = requests.get(
-                "https://hn.algolia.com/api/v1/search_by_date",
-                params={
-                    "query": query,
-                    "tags": "(story,show_hn,ask_hn)",
-                    "numericFilters": f"created_at_i>{cutoff_ts}",
-                    "hitsPerPage": 10,
-                },
-                timeout=10,
-            )
-            resp.raise_for_status()
-            for hit in resp.json().get("hits", []):
-                url = hit.get("url") or f"https://news.ycombinator.com/item?id={hit.get('objectID')}"
-                if url in seen_urls:
-                    continue
-                seen_urls.add(url)
-                articles.append({
-                    "title": hit.get("title", "").strip(),
-                    "summary": f"HN: {hit.get('points', 0)} points, {hit.get('num_comments', 0)} comments",
-                    "url": url,
-                    "source": "Hacker News",
-                })
-        except Exception as e:
-            print(f"[hn] Query '{query}' failed: {e}")
+def _iter_hn_query(config, query, cutoff_ts):
+    try:
+        resp = resilience.get(
+            "https://hn.algolia.com/api/v1/search_by_date", "hn", config,
+            params={
+                "query": query,
+                "tags": "(story,show_hn,ask_hn)",
+                "numericFilters": f"created_at_i>{cutoff_ts}",
+                "hitsPerPage": 10,
+            },
+        )
+        hits = resp.json().get("hits", [])
+    except Exception as e:
+        print(f"[hn] Query '{query}' failed: {e}")
+        metrics.inc("feed_errors", feed=f"hn:{query}", reason="error")
+        return
+
+    metrics.inc("feed_articles", len(hits), feed=f"hn:{query}")
+    for hit in hits:
+        yield Article(
+            title=hit.get("title", "").strip(),
+            summary=f"HN: {hit.get('points', 0)} points, {hit.get('num_comments', 0)} comments",
+            url=hit.get("url") or f"https://news.ycombinator.com/item?id={hit.get('objectID')}",
+            source="Hacker News",
+            published=datetime.datetime.fromtimestamp(hit["created_at_i"], datetime.timezone.utc)
+                      if hit.get("created_at_i") else None,
+        )
+
+
+# ── JOBS ──────────────────────────────────────────────────────────────────────
+
+def fetch_jobs(config):
+    """Split the configured source into independent jobs — one per RSS feed or
+    HN query — so they can run concurrently. Each job is a zero-arg callable
+    returning an iterator of articles; dedup and the digest cap are applied
+    downstream by iter_articles."""
+    source = config.SOURCE
+    jobs = []
+
+    if source in ("rss", "rss+hn"):
+        keywords, no_filter_feeds, all_feeds, cutoff = _rss_settings(config)
+        for url in all_feeds:
+            jobs.append(functools.partial(
+                _iter_feed, config, url, keywords, url not in no_filter_feeds, cutoff))
+    if source in ("hn", "rss+hn"):
+        cutoff_ts, hn_queries = _hn_settings(config)
+        for query in hn_queries:
+            jobs.append(functools.partial(_iter_hn_query, config, query, cutoff_ts))
+    if source == "google":
+        jobs.append(functools.partial(iter_google, config))
+    elif source == "bing":
+        jobs.append(functools.partial(iter_bing, config))
 
-    print(f"[fetch] Got {len(articles)} articles from Hacker News")
-    return articles[:config.MAX_ARTICLES_IN_DIGEST]
+    if not jobs:
+        sys.exit(f"Unknown SOURCE '{source}' in config.py")
+    return jobs
 
 
 # ── UTILS ─────────────────────────────────────────────────────────────────────
 
-def _clean_html(text):
-    return re.sub(r"<[^>]+>", " ", text).strip()
+SUMMARY_CHARS = 500          # summary length kept per article
+KEYWORD_SCAN_CHARS = 2000    # visible summary text searched for keywords
+
+# Elements whose contents are never visible text (an unclosed one runs to the
+# end of the input), tags that separate words visually, everything else, and a
+# tag cut in half at the end of a window
+_COMMENT = re.compile(r"<!--.*?(?:-->|$)", re.DOTALL)
+_HIDDEN_ELEMENT = re.compile(
+    r"<(script|style|noscript|template|svg|iframe|head)\b[^<]*(?:<(?!/\1\s*>)[^<]*)*(?:</\1\s*>)?",
+    re.IGNORECASE)
+_BLOCK_TAG = re.compile(
+    r"</?(?:p|div|br|hr|img|li|ul|ol|h[1-6]|tr|td|th|blockquote|figure|figcaption|section|article)\b[^<>]*>",
+    re.IGNORECASE)
+_TAG = re.compile(r"</?[a-zA-Z][^<>]*>")
+_CUT_TAG = re.compile(r"</?[a-zA-Z][^<>]*$")
+
+
+def _clean_html(text, limit=SUMMARY_CHARS):
+    """Up to `limit` chars of visible text from an HTML fragment: tags and
+    script/style contents dropped, entities decoded, whitespace collapsed.
+
+    A fragment of up to 4× `limit` chars (the usual teaser) is cleaned in
+    one pass. A longer one is cleaned a window at a time, growing 4× until it
+    yields enough text, so a feed that embeds a 300 KB article costs about
+    the same as one with a short teaser. A window that cuts an element or
+    entity in half just comes up short and gets widened."""
+    window = limit * 4
+    if len(text) <= window:
+        return _visible(text)[:limit]
+    while True:
+        visible = _visible(text[:window], cut=True)
+        if len(visible) >= limit or window >= len(text):
+            return visible[:limit]
+        window *= 4
+
+
+def _visible(fragment, cut=False):
+    """Visible text of `fragment`; `cut` means it ends where a longer input
+    was truncated, so an unclosed tag at the very end is markup, not text."""
+    if "<" in fragment:
+        if "<!--" in fragment:
+            fragment = _COMMENT.sub("", fragment)
+        fragment = _HIDDEN_ELEMENT.sub(" ", fragment)
+        fragment = _BLOCK_TAG.sub(" ", fragment)
+        fragment = _TAG.sub("", fragment)
+        if cut:
+            fragment = _CUT_TAG.sub("", fragment)
+    if "&" in fragment:
+        fragment = html.unescape(fragment)
+    return " ".join(fragment.split())
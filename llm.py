@@ -4,7 +4,14 @@ Switch backend via config.py — no code changes needed.
 """
 
 import json
+import queue
+import re
 import sys
+import threading
+import time
+
+import deadline
+import metrics
 
 SYSTEM_PROMPT = """You are a tech industry analyst covering three beats:
 1. Neurotechnology — BCIs, neural implants, neuromodulation, brain imaging, neurostimulation, etc.
@@ -15,7 +22,7 @@ SYSTEM_PROMPT = """You are a tech industry analyst covering three beats:
 Your job is to review article headlines and summaries, filter for relevance to any of these beats, 
 and categorize them. Especially prioritize articles at the intersection of neuroscience and AI."""
 
-USER_PROMPT_TEMPLATE = """Review these articles and return a JSON array of the ones that are 
+USER_INSTRUCTIONS = """Review these articles and return a JSON array of the ones that are 
 relevant to ANY of these three areas:
 
 1. **Neurotechnology**: brain-computer interfaces, neural implants, neuromodulation, 
@@ -37,65 +44,347 @@ For each relevant article, assign ONE category:
 - "other" — notable news that doesn't fit above
 
 Return ONLY valid JSON — an array of objects with these fields:
-  title, url, source, category, one_line_summary
+  id, category, one_line_summary
+where id is the number the article is listed under.
+
+Articles to review, one per line as: id. [source] title — summary"""
+
+# The instructions never change between calls, so they come first — the
+# Claude backend marks everything up to here as a cacheable prefix.
+USER_PROMPT_TEMPLATE = USER_INSTRUCTIONS + "\n{articles}"
 
-Articles to review:
-{articles}"""
 
+class BackendError(Exception):
+    """A backend couldn't serve a request — the chain moves on to the next one."""
 
-def analyze(articles, config):
+
+def analyze(articles, config, until=None):
+    """Filter and categorize `articles` with the configured backends.
+
+    With `until` (a time.monotonic() value) the backends only get as many
+    articles as LLM_SECONDS_PER_ARTICLE says they can finish in time, taken
+    from the highest-priority sources first; the rest, and everything if no
+    backend answers by then, are categorized by keyword rules instead."""
     if not articles:
         print("[llm] No articles to analyze.")
         return []
 
-    backend = config.LLM_BACKEND
-    print(f"[llm] Analyzing {len(articles)} articles with backend: {backend}")
-
-    prompt = USER_PROMPT_TEMPLATE.format(
-        articles=json.dumps([
-            {"title": a["title"], "summary": a["summary"], "url": a["url"], "source": a["source"]}
-            for a in articles
-        ], indent=2)
-    )
-
+    chain = backend_chain(config)
+    if until is None:
+        print(f"[llm] Analyzing {len(articles)} articles with backend: {' → '.join(chain)}")
+        verdicts, backend = _run_chain(articles, chain, config)
+        return _apply_verdicts(articles, verdicts, backend)
+
+    # The model gets the highest-priority sources' articles (config order),
+    # not whichever feeds happened to answer first
+    articles = sorted(articles, key=lambda a: a.rank)
+    fits = _articles_in_time(chain[0], until - time.monotonic(), config)
+    sent, rest = articles[:fits], articles[fits:]
+    if rest:
+        deadline.note(f"{len(rest)} of {len(articles)} articles categorized by keywords, not by {chain[0]}")
+    kept = []
+    if sent:
+        print(f"[llm] Analyzing {len(sent)} articles with backend: {' → '.join(chain + ['keywords'])}")
+        verdicts, backend = _run_chain(sent, chain + ["keywords"], config, until)
+        if backend == "keywords":
+            deadline.note(f"no LLM backend answered in time — {len(sent)} articles categorized by keywords")
+        kept = _apply_verdicts(sent, verdicts, backend)
+    if rest:
+        kept += _apply_verdicts(rest, _categorize_by_keywords(rest), "keywords")
+    return kept
+
+
+def _articles_in_time(backend, seconds, config):
+    """How many articles `backend` can analyze in `seconds`, going by
+    LLM_SECONDS_PER_ARTICLE (a rough per-article cost, prompt included)."""
+    rates = getattr(config, "LLM_SECONDS_PER_ARTICLE", {"ollama": 1.5, "claude": 0.15, "openai": 0.15})
+    return max(0, int(seconds / rates.get(backend, 1.0)))
+
+
+def _apply_verdicts(articles, verdicts, backend):
+    """Write the LLM's verdicts onto the matching input Articles (by the id
+    they were listed under, falling back to URL or title if the model echoed
+    those instead) and return the kept ones in the order the model listed
+    them. Verdicts matching no input are dropped."""
+    by_url = {a.url: a for a in articles}
+    by_title = {a.title: a for a in articles}
+    kept = []
+    for v in verdicts:
+        if not isinstance(v, dict):
+            continue
+        a = _by_id(articles, v.get("id")) or by_url.get(v.get("url")) or by_title.get(v.get("title"))
+        if a is None or a.category is not None:
+            continue
+        a.category = str(v.get("category") or "other").lower()
+        a.one_line_summary = v.get("one_line_summary") or a.summary
+        a.backend = backend
+        kept.append(a)
+    return kept
+
+
+def _by_id(articles, article_id):
+    try:
+        i = int(article_id) - 1
+    except (TypeError, ValueError):
+        return None
+    return articles[i] if 0 <= i < len(articles) else None
+
+
+def backend_chain(config):
+    """Backends to try, in order: LLM_BACKENDS if set, else just LLM_BACKEND."""
+    return list(getattr(config, "LLM_BACKENDS", None) or [config.LLM_BACKEND])
+
+
+def _run_chain(articles, chain, config, until=None):
+    """Try each backend in turn, each with its own timeout. With LLM_HEDGE_AFTER
+    set, a backend that hasn't answered within that many seconds gets company:
+    the same batch also goes to the next backend and the first answer wins.
+    Losers keep running in daemon threads and their results are ignored.
+
+    With `until`, no model backend is waited on past that time; once it has
+    passed the chain skips to its "keywords" entry, which is never timed out."""
+    timeouts = getattr(config, "LLM_TIMEOUTS", {})
+    hedge_after = getattr(config, "LLM_HEDGE_AFTER", None)
+    done = queue.Queue()
+    in_flight = {}   # backend -> (start time, end time)
+    errors = []
+    next_idx = 0
+    hedge_at = None
+
+    def launch():
+        nonlocal next_idx, hedge_at
+        name = chain[next_idx]
+        next_idx += 1
+        start = time.monotonic()
+        end = start + timeouts.get(name, 600)
+        if until is not None and name != "keywords":
+            end = min(end, until)
+        in_flight[name] = (start, end)
+        hedge_at = start + hedge_after if hedge_after and next_idx < len(chain) else None
+
+        def run():
+            try:
+                done.put((name, _analyze_with(name, articles, config), None))
+            except (Exception, SystemExit) as e:
+                done.put((name, None, e))
+        threading.Thread(target=run, daemon=True).start()
+
+    launch()
+    while in_flight or next_idx < len(chain):
+        if until is not None and time.monotonic() >= until and chain[-1] == "keywords" \
+                and next_idx < len(chain):
+            # Out of time: give up on the model backends, use the keyword rules
+            for name in in_flight:
+                errors.append(f"{name}: out of time")
+            in_flight.clear()
+            next_idx = len(chain) - 1
+        if not in_flight:
+            launch()
+            continue
+
+        wake = min([end for _, end in in_flight.values()] + ([hedge_at] if hedge_at else []))
+        try:
+            name, results, err = done.get(timeout=max(0.0, wake - time.monotonic()))
+        except queue.Empty:
+            now = time.monotonic()
+            for name, (start, end) in list(in_flight.items()):
+                if now >= end:
+                    del in_flight[name]
+                    errors.append(f"{name}: timed out after {now - start:.1f}s")
+                    print(f"[llm] {name} timed out after {now - start:.1f}s")
+            if hedge_at and now >= hedge_at and next_idx < len(chain):
+                print(f"[llm] No answer after {hedge_after}s — hedging with {chain[next_idx]}")
+                launch()
+            continue
+
+        if name not in in_flight:
+            continue  # already given up on
+        start, _ = in_flight.pop(name)
+        if err is None:
+            print(f"[llm] Batch served by {name} in {time.monotonic() - start:.1f}s")
+            return results, name
+        errors.append(f"{name}: {err}")
+        print(f"[llm] {name} failed: {err}")
+
+    sys.exit("All LLM backends failed:\n  " + "\n  ".join(errors))
+
+
+def _analyze_with(backend, articles, config):
+    if backend == "keywords":
+        return _categorize_by_keywords(articles)
     if backend == "ollama":
-        raw = _call_ollama(prompt, config)
+        # One request per server slot — Ollama runs them side by side
+        slots = min(getattr(config, "OLLAMA_NUM_PARALLEL", 1), len(articles))
+        if slots > 1:
+            from concurrent.futures import ThreadPoolExecutor
+
+            # Ids keep counting across chunks so verdicts map straight back
+            size = -(-len(articles) // slots)
+            starts = range(0, len(articles), size)
+            with ThreadPoolExecutor(max_workers=len(starts)) as pool:
+                raws = pool.map(lambda i: _call_ollama(
+                    _build_prompt(articles[i:i + size], config, first_id=i + 1), config), starts)
+                return [a for raw in raws for a in _parse_response(raw)]
+        raw = _call_ollama(_build_prompt(articles, config), config)
     elif backend == "claude":
-        raw = _call_claude(prompt, config)
+        raw = _call_claude(_build_prompt(articles, config), config)
     elif backend == "openai":
-        raw = _call_openai(prompt, config)
+        raw = _call_openai(_build_prompt(articles, config), config)
     else:
-        sys.exit(f"Unknown LLM_BACKEND '{backend}' in config.py")
+        raise BackendError(f"Unknown LLM backend '{backend}' in config.py")
 
     return _parse_response(raw)
 
 
+def estimate_tokens(text):
+    """Rough token count — ~4 characters per token for English text, which
+    is close enough for budgeting without shipping a tokenizer."""
+    return -(-len(text) // 4)
+
+
+def _build_prompt(articles, config, first_id=1):
+    """The instructions plus one numbered line per article. URLs stay out of
+    the prompt (the model answers with ids), and summaries are cut to
+    LLM_SUMMARY_CHARS, then shortened evenly until the article list fits in
+    LLM_PROMPT_TOKEN_BUDGET. Titles are never cut."""
+    budget = getattr(config, "LLM_PROMPT_TOKEN_BUDGET", 6000)
+    heads = [f"{first_id + i}. [{a.source}] {a.title}" for i, a in enumerate(articles)]
+    fixed = estimate_tokens("\n".join(heads))
+    room = (budget - fixed) * 4 // max(len(articles), 1) - len(" — ")
+    chars = max(0, min(getattr(config, "LLM_SUMMARY_CHARS", 240), room))
+
+    lines = []
+    for head, a in zip(heads, articles):
+        summary = _truncate(a.summary or "", chars)
+        lines.append(f"{head} — {summary}" if summary else head)
+    listing = "\n".join(lines)
+
+    tokens = estimate_tokens(listing)
+    metrics.inc("llm_estimated_prompt_tokens", tokens)
+    note = f", summaries cut to {chars} chars" if chars < getattr(config, "LLM_SUMMARY_CHARS", 240) else ""
+    print(f"[llm] Prompt: {len(articles)} articles, ~{tokens} tokens (budget {budget}{note})")
+    return USER_PROMPT_TEMPLATE.format(articles=listing)
+
+
+def _truncate(text, chars):
+    text = " ".join(text.split())
+    if len(text) <= chars:
+        return text
+    cut = text[:chars].rsplit(" ", 1)[0] if chars > 20 else text[:chars]
+    return cut + "…" if cut else ""
+
+
+# ── KEYWORD RULES ─────────────────────────────────────────────────────────────
+
+# Last resort when the LLM can't make the deadline: first matching rule wins.
+# Every article is kept — there's no relevance filter without a model.
+KEYWORD_RULES = [
+    ("approval", re.compile(r"\b(fda|clearance|cleared|approv\w*|ce mark)\b", re.I)),
+    ("funding",  re.compile(r"\b(rais\w+|funding|series [a-e]|seed round|invest\w*|acqui\w+)\b", re.I)),
+    ("neuro_ai", re.compile(r"\b(ai|machine learning|deep learning)\b.*\b(brain|neur\w*)"
+                            r"|\b(brain|neur\w*)\b.*\b(ai|machine learning|deep learning)\b", re.I)),
+    ("research", re.compile(r"\b(study|studies|researchers?|trial|journal|paper|scientists?)\b", re.I)),
+    ("policy",   re.compile(r"\b(policy|regulat\w+|ethic\w*|law|lawsuit|privacy|congress|senate)\b", re.I)),
+    ("ai_tool",  re.compile(r"\b(ai|llm|gpt\w*|model|chatbot|copilot|agents?|openai|anthropic|gemini)\b", re.I)),
+    ("product",  re.compile(r"\b(launch\w*|unveil\w*|releases?|introduc\w+|announc\w+)\b", re.I)),
+]
+
+
+def _categorize_by_keywords(articles):
+    """Verdicts in the LLM's format from KEYWORD_RULES, with the summary's
+    first sentence as the one-liner."""
+    verdicts = []
+    for i, a in enumerate(articles, 1):
+        text = f"{a.title} {a.summary or ''}"
+        category = next((cat for cat, rule in KEYWORD_RULES if rule.search(text)), "other")
+        first = re.split(r"(?<=[.!?])\s", " ".join((a.summary or a.title).split()), maxsplit=1)[0]
+        verdicts.append({"id": i, "category": category, "one_line_summary": _truncate(first, 160)})
+    return verdicts
+
+
 # ── OLLAMA ────────────────────────────────────────────────────────────────────
 
-def _call_ollama(prompt, config):
+# One pooled session for every Ollama call, and a semaphore so concurrent
+# callers (parallel chunks, pipeline batches) never exceed the server's slots.
+_ollama_session = None
+_ollama_slots = None
+_ollama_lock = threading.Lock()
+
+
+def _get_ollama_session(config):
+    global _ollama_session, _ollama_slots
     try:
         import requests
     except ImportError:
-        sys.exit("requests not installed. Run: pip install requests")
-
+        raise BackendError("requests not installed. Run: pip install requests")
+
+    with _ollama_lock:
+        if _ollama_session is None:
+            slots = max(1, getattr(config, "OLLAMA_NUM_PARALLEL", 1))
+            session = requests.Session()
+            session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=slots))
+            session.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=slots))
+            _ollama_session = session
+            _ollama_slots = threading.BoundedSemaphore(slots)
+    return _ollama_session
+
+
+def warm_up(config):
+    """Load the Ollama model (and pin it with keep_alive) without generating,
+    so the first real request doesn't pay the model load. No-op for other
+    backends; failures are ignored — the real call will report them."""
+    if "ollama" not in backend_chain(config):
+        return
     try:
-        resp = requests.post(
-            f"{config.OLLAMA_BASE_URL}/api/chat",
-            json={
-                "model": config.OLLAMA_MODEL,
-                "messages": [
-                    {"role": "system", "content": SYSTEM_PROMPT},
-                    {"role": "user", "content": prompt},
-                ],
-                "stream": False,
-                "format": "json",
-            },
-            timeout=120,
+        session = _get_ollama_session(config)
+        session.post(
+            f"{config.OLLAMA_BASE_URL}/api/generate",
+            json={"model": config.OLLAMA_MODEL, "keep_alive": getattr(config, "OLLAMA_KEEP_ALIVE", "30m")},
+            timeout=(getattr(config, "OLLAMA_CONNECT_TIMEOUT", 5), getattr(config, "OLLAMA_READ_TIMEOUT", 300)),
         )
-        resp.raise_for_status()
-        return resp.json()["message"]["content"]
+    except Exception:
+        pass
+
+
+def _call_ollama(prompt, config):
+    session = _get_ollama_session(config)   # raises BackendError without requests
+    import requests
+
+    try:
+        with _ollama_slots:
+            # Stream the reply: the read timeout then applies between chunks
+            # rather than to the whole generation, so long outputs on CPU
+            # don't get cut off. The with-block closes the stream (and frees
+            # the connection) if it fails partway.
+            with session.post(
+                f"{config.OLLAMA_BASE_URL}/api/chat",
+                json={
+                    "model": config.OLLAMA_MODEL,
+                    "messages": [
+                        {"role": "system", "content": SYSTEM_PROMPT},
+                        {"role": "user", "content": prompt},
+                    ],
+                    "stream": True,
+                    "format": "json",
+                    "keep_alive": getattr(config, "OLLAMA_KEEP_ALIVE", "30m"),
+                },
+                stream=True,
+                timeout=(getattr(config, "OLLAMA_CONNECT_TIMEOUT", 5), getattr(config, "OLLAMA_READ_TIMEOUT", 300)),
+            ) as resp:
+                resp.raise_for_status()
+                parts = []
+                for line in resp.iter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if "error" in chunk:
+                        raise RuntimeError(chunk["error"])
+                    parts.append(chunk.get("message", {}).get("content", ""))
+                    if chunk.get("done"):
+                        _log_ollama_stats(chunk)
+                return "".join(parts)
     except requests.exceptions.ConnectionError:
-        sys.exit(
+        raise BackendError(
             "Cannot connect to Ollama. Make sure it's running:\n"
             "  1. Install: https://ollama.com\n"
             f"  2. Pull model: ollama pull {config.OLLAMA_MODEL}\n"
@@ -103,49 +392,135 @@ def _call_ollama(prompt, config):
         )
 
 
+def _log_ollama_stats(done_chunk):
+    """Print prompt/generation throughput from Ollama's final stream chunk."""
+    def rate(count_key, duration_key):
+        count = done_chunk.get(count_key, 0)
+        duration = done_chunk.get(duration_key, 0)  # nanoseconds
+        return count, (count / (duration / 1e9) if duration else 0.0)
+
+    prompt_tokens, prompt_tps = rate("prompt_eval_count", "prompt_eval_duration")
+    eval_tokens, eval_tps = rate("eval_count", "eval_duration")
+    print(f"[llm] ollama: prompt {prompt_tokens} tok @ {prompt_tps:.1f} tok/s, "
+          f"generated {eval_tokens} tok @ {eval_tps:.1f} tok/s")
+    metrics.inc("llm_requests", backend="ollama")
+    metrics.inc("llm_prompt_tokens", prompt_tokens, backend="ollama")
+    metrics.inc("llm_completion_tokens", eval_tokens, backend="ollama")
+
+
 # ── CLAUDE ────────────────────────────────────────────────────────────────────
 
-def _call_claude(prompt, config):
+_claude_client = None
+_claude_lock = threading.Lock()
+
+
+def _get_claude_client(config):
+    """One long-lived client (and connection pool) for every Claude call."""
+    global _claude_client
     try:
         import anthropic
     except ImportError:
-        sys.exit("anthropic not installed. Run: pip install anthropic")
+        raise BackendError("anthropic not installed. Run: pip install anthropic")
 
     if not config.CLAUDE_API_KEY:
-        sys.exit("Set CLAUDE_API_KEY in config.py")
-
-    client = anthropic.Anthropic(api_key=config.CLAUDE_API_KEY)
-    msg = client.messages.create(
-        model=config.CLAUDE_MODEL,
-        max_tokens=8192,
-        system=SYSTEM_PROMPT,
-        messages=[{"role": "user", "content": prompt}],
-    )
+        raise BackendError("Set CLAUDE_API_KEY in config.py")
+
+    with _claude_lock:
+        if _claude_client is None:
+            kwargs = {"api_key": config.CLAUDE_API_KEY}
+            if getattr(config, "CLAUDE_BASE_URL", ""):
+                kwargs["base_url"] = config.CLAUDE_BASE_URL
+            _claude_client = anthropic.Anthropic(**kwargs)
+    return _claude_client
+
+
+def _call_claude(prompt, config):
+    client = _get_claude_client(config)
+    msg = client.messages.create(**_claude_params(prompt, config))
+    _log_claude_usage(msg.usage)
     return msg.content[0].text
 
 
+def _claude_params(prompt, config):
+    """Messages API parameters for one prompt (also used for batch requests)."""
+    # Split the static instruction block from the per-call articles and put a
+    # cache breakpoint after it, so the system prompt + instructions are read
+    # from the prompt cache after the first call. Only worth it once that
+    # prefix reaches the model's minimum cacheable length: below it the API
+    # ignores the breakpoint. The default prompts (~510 tokens) don't.
+    prefix = estimate_tokens(SYSTEM_PROMPT + USER_INSTRUCTIONS)
+    if prompt.startswith(USER_INSTRUCTIONS) and prefix >= getattr(config, "CLAUDE_CACHE_MIN_TOKENS", 4096):
+        content = [
+            {"type": "text", "text": USER_INSTRUCTIONS, "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": prompt[len(USER_INSTRUCTIONS):]},
+        ]
+    else:
+        content = prompt
+
+    return {
+        "model": config.CLAUDE_MODEL,
+        "max_tokens": 8192,
+        "system": [{"type": "text", "text": SYSTEM_PROMPT}],
+        "messages": [{"role": "user", "content": content}],
+    }
+
+
+def _log_claude_usage(usage):
+    cache_write = getattr(usage, "cache_creation_input_tokens", 0) or 0
+    cache_read = getattr(usage, "cache_read_input_tokens", 0) or 0
+    print(f"[llm] claude: input {usage.input_tokens} tok "
+          f"(cache write {cache_write}, cache read {cache_read}), output {usage.output_tokens} tok")
+    metrics.inc("llm_requests", backend="claude")
+    metrics.inc("llm_prompt_tokens", usage.input_tokens, backend="claude")
+    metrics.inc("llm_completion_tokens", usage.output_tokens, backend="claude")
+    metrics.inc("llm_cache_read_tokens", cache_read, backend="claude")
+    metrics.inc("llm_cache_write_tokens", cache_write, backend="claude")
+
+
 # ── OPENAI ────────────────────────────────────────────────────────────────────
 
-def _call_openai(prompt, config):
+def _get_openai_client(config):
     try:
         import openai
     except ImportError:
-        sys.exit("openai not installed. Run: pip install openai")
+        raise BackendError("openai not installed. Run: pip install openai")
 
     if not config.OPENAI_API_KEY:
-        sys.exit("Set OPENAI_API_KEY in config.py")
+        raise BackendError("Set OPENAI_API_KEY in config.py")
+
+    return openai.OpenAI(api_key=config.OPENAI_API_KEY, base_url=getattr(config, "OPENAI_BASE_URL", "") or None)
+
 
-    client = openai.OpenAI(api_key=config.OPENAI_API_KEY)
-    resp = client.chat.completions.create(
-        model=config.OPENAI_MODEL,
-        messages=[
+def _call_openai(prompt, config):
+    client = _get_openai_client(config)
+    resp = client.chat.completions.create(**_openai_body(prompt, config))
+    _record_openai_usage(resp.usage)
+    return resp.choices[0].message.content
+
+
+def _openai_body(prompt, config):
+    """Chat Completions request body for one prompt (also used for batch requests)."""
+    return {
+        "model": config.OPENAI_MODEL,
+        "messages": [
             {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": prompt},
         ],
-        response_format={"type": "json_object"},
-        max_tokens=4096,
-    )
-    return resp.choices[0].message.content
+        "response_format": {"type": "json_object"},
+        "max_tokens": 4096,
+    }
+
+
+def _record_openai_usage(usage):
+    if usage is None:
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", 0) or 0
+    metrics.inc("llm_requests", backend="openai")
+    # OpenAI counts cached tokens inside prompt_tokens; store the uncached part
+    metrics.inc("llm_prompt_tokens", usage.prompt_tokens - cached, backend="openai")
+    metrics.inc("llm_completion_tokens", usage.completion_tokens, backend="openai")
+    metrics.inc("llm_cache_read_tokens", cached, backend="openai")
 
 
 # ── PARSE ─────────────────────────────────────────────────────────────────────
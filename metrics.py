@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+metrics.py — Per-run pipeline metrics as an OpenMetrics textfile.
+
+Stages record into a process-wide registry while the run goes; run.py writes
+it to METRICS_FILE at the end (also when the run fails), for node_exporter's
+textfile collector (point --collector.textfile.directory at the file's
+directory) or anything else that scrapes Prometheus text.
+
+Every metric is a gauge holding the last run's value — a cron job has no
+process to keep counters alive between runs, and Prometheus keeps the
+history. The file is written to a temp name and renamed into place so the
+collector never reads half a file.
+
+Check a written file locally:
+  python metrics.py digest.prom
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+PREFIX = "digest_"
+
+HELP = {
+    "run_success": "1 if the last run finished, 0 if it failed",
+    "last_run_timestamp_seconds": "Unix time the last run finished",
+    "stage_duration_seconds": "Wall time of each pipeline stage in the last run",
+    "feed_articles": "Articles a feed or query yielded (after date/keyword filters)",
+    "feed_errors": "Failed fetches per feed or query (circuit_open = skipped by the breaker)",
+    "http_requests": "HTTP fetches by source kind and outcome",
+    "http_response_bytes": "Response body bytes downloaded by source kind",
+    "llm_requests": "LLM calls per backend",
+    "llm_prompt_tokens": "Prompt tokens the backend reported (the uncached part for any backend that reports cache usage)",
+    "llm_completion_tokens": "Completion tokens the backend reported",
+    "llm_cache_read_tokens": "Prompt tokens served from the backend's prompt cache",
+    "llm_cache_write_tokens": "Prompt tokens written to the backend's prompt cache",
+    "llm_cache_hit_ratio": "Cached share of prompt tokens",
+    "llm_estimated_prompt_tokens": "Our own estimate of the article-list tokens sent",
+    "articles": "Articles at each stage of the last run",
+    "degraded": "Degradations made to meet the --deadline (sources cut, keyword categorization)",
+}
+
+_lock = threading.Lock()
+_values = {}   # (name, sorted label items) -> value
+
+
+def inc(name, value=1, **labels):
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _values[key] = _values.get(key, 0) + value
+
+
+def gauge(name, value, **labels):
+    with _lock:
+        _values[(name, tuple(sorted(labels.items())))] = value
+
+
+@contextmanager
+def timer(stage):
+    """Record the block's wall time as stage_duration_seconds{stage=...}."""
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        gauge("stage_duration_seconds", round(time.monotonic() - start, 3), stage=stage)
+
+
+def render(success):
+    """The registry as OpenMetrics text, ending in "# EOF"."""
+    gauge("run_success", int(bool(success)))
+    gauge("last_run_timestamp_seconds", round(time.time(), 3))
+    _derive_cache_ratio()
+
+    with _lock:
+        families = {}
+        for (name, labels), value in _values.items():
+            families.setdefault(name, []).append((labels, value))
+
+    lines = []
+    for name in sorted(families):
+        full = PREFIX + name
+        lines.append(f"# HELP {full} {_escape(HELP.get(name, name.replace('_', ' ')))}")
+        lines.append(f"# TYPE {full} gauge")
+        for labels, value in sorted(families[name], key=lambda s: s[0]):
+            label_str = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels)
+            lines.append(f"{full}{{{label_str}}} {_number(value)}" if label_str else f"{full} {_number(value)}")
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def write(config, success):
+    """Write the metrics file (atomically); a no-op if METRICS_FILE is blank."""
+    target = getattr(config, "METRICS_FILE", "")
+    if not target:
+        return
+    path = Path(__file__).parent / target
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(render(success), encoding="utf-8")
+    os.replace(tmp, path)
+    print(f"[metrics] Written to {path}")
+
+
+def _derive_cache_ratio():
+    with _lock:
+        backends = {dict(labels).get("backend") for name, labels in _values if name == "llm_cache_read_tokens"}
+        for backend in backends:
+            label = (("backend", backend),)
+            cached = _values.get(("llm_cache_read_tokens", label), 0)
+            total = cached + _values.get(("llm_prompt_tokens", label), 0) \
+                + _values.get(("llm_cache_write_tokens", label), 0)
+            _values[("llm_cache_hit_ratio", label)] = round(cached / total, 4) if total else 0
+
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# ── LOCAL CHECK ───────────────────────────────────────────────────────────────
+
+_NAME = r"[a-zA-Z_:][a-zA-Z0-9_:]*"
+_SAMPLE = re.compile(rf'^({_NAME})(\{{({_NAME}="(\\.|[^"\\])*")(,{_NAME}="(\\.|[^"\\])*")*\}})? (\S+)$')
+
+
+def check(text):
+    """Problems with an OpenMetrics textfile (empty list if it's valid). Uses
+    prometheus_client's parser when installed, else a built-in check of the
+    parts this module writes."""
+    try:
+        from prometheus_client.openmetrics.parser import text_string_to_metric_families
+    except ImportError:
+        pass
+    else:
+        try:
+            list(text_string_to_metric_families(text))
+        except Exception as e:
+            return [str(e)]
+        return []
+
+    problems = []
+    lines = text.split("\n")
+    if lines[-1] != "" or lines[-2] != "# EOF":
+        problems.append('file must end with "# EOF" and a newline')
+    typed, seen, current = set(), set(), None
+    for i, line in enumerate(lines[:-2], 1):
+        if line.startswith("# TYPE "):
+            current = line.split()[2]
+            if current in typed:
+                problems.append(f"line {i}: {current} declared twice (families must be contiguous)")
+            typed.add(current)
+        elif line.startswith("# HELP "):
+            continue
+        else:
+            m = _SAMPLE.match(line)
+            if not m:
+                problems.append(f"line {i}: not a valid sample: {line!r}")
+                continue
+            if m.group(1) != current:
+                problems.append(f"line {i}: {m.group(1)} has no # TYPE line before it")
+            try:
+                float(m.group(7))
+            except ValueError:
+                problems.append(f"line {i}: value {m.group(7)!r} is not a number")
+            if line.rsplit(" ", 1)[0] in seen:
+                problems.append(f"line {i}: duplicate sample {line.rsplit(' ', 1)[0]}")
+            seen.add(line.rsplit(" ", 1)[0])
+    return problems
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else "digest.prom"
+    problems = check(Path(path).read_text(encoding="utf-8"))
+    for p in problems:
+        print(f"[metrics] {p}")
+    print(f"[metrics] {path}: {'OK' if not problems else f'{len(problems)} problems'}")
+    sys.exit(1 if problems else 0)
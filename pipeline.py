@@ -0,0 +1,101 @@
+"""
+pipeline.py — Overlapped fetch → LLM (producer/consumer).
+
+Fetched articles stream into a bounded queue as each feed is parsed; a batcher
+dispatches an LLM call as soon as a batch fills or the flush deadline passes;
+analyzed batches are yielded in completion order. run.py renders once the
+stream is done, after checking the run found anything. End-to-end
+time approaches max(fetch, analyze) instead of their sum.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import deadline
+import fetchers
+import llm
+import metrics
+
+_DONE = object()
+
+
+def stream(config, fetched=None):
+    """Yield analyzed article batches as they complete.
+
+    If `fetched` is a list, every article sent to the LLM is appended to it so
+    the caller can report what was filtered out. Under a --deadline, fetching
+    and analysis stop at their stage's cut-off (see deadline.py)."""
+    batch_size = getattr(config, "LLM_BATCH_SIZE", 20)
+    flush_after = getattr(config, "LLM_BATCH_FLUSH_SECONDS", 5.0)
+
+    articles_q = queue.Queue(maxsize=getattr(config, "PIPELINE_QUEUE_SIZE", 100))
+    results_q = queue.Queue()
+    print(f"[pipeline] LLM batches of {batch_size} (flush {flush_after}s)")
+
+    def produce():
+        # Deduped and capped as it streams; a full queue holds the fetchers back
+        with metrics.timer("fetch"):
+            for a in fetchers.iter_articles(config, workers=getattr(config, "FETCH_WORKERS", 8),
+                                            until=deadline.stage_end("fetch", config)):
+                articles_q.put(a)
+        articles_q.put(_DONE)
+
+    def consume():
+        with ThreadPoolExecutor(max_workers=_llm_workers(config)) as pool:
+            batch, flush_at = [], None
+            while True:
+                timeout = None if flush_at is None else max(0.0, flush_at - time.monotonic())
+                try:
+                    item = articles_q.get(timeout=timeout)
+                except queue.Empty:
+                    item = None  # flush deadline passed
+
+                if item is not None and item is not _DONE:
+                    if not batch:
+                        flush_at = time.monotonic() + flush_after
+                    batch.append(item)
+
+                if batch and (item is None or item is _DONE or len(batch) >= batch_size):
+                    if fetched is not None:
+                        fetched.extend(batch)
+                    pool.submit(llm.analyze, batch, config, deadline.stage_end("llm", config)) \
+                        .add_done_callback(results_q.put)
+                    batch, flush_at = [], None
+
+                if item is _DONE:
+                    break
+        results_q.put(_DONE)
+
+    # Load the local model while the feeds download
+    threading.Thread(target=llm.warm_up, args=(config,), daemon=True).start()
+
+    threads = [threading.Thread(target=_guard(fn, results_q), daemon=True) for fn in (produce, consume)]
+    for t in threads:
+        t.start()
+
+    while True:
+        item = results_q.get()
+        if item is _DONE:
+            break
+        if isinstance(item, BaseException):
+            raise item
+        yield item.result()
+
+
+def _llm_workers(config):
+    if llm.backend_chain(config)[0] == "ollama":
+        return getattr(config, "OLLAMA_NUM_PARALLEL", 1)
+    return getattr(config, "LLM_WORKERS", 4)
+
+
+def _guard(fn, results_q):
+    """Forward a thread's exception (including sys.exit) to the main thread."""
+    def run():
+        try:
+            fn()
+        except BaseException as e:
+            results_q.put(e)
+            results_q.put(_DONE)
+    return run
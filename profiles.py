@@ -0,0 +1,83 @@
+"""
+profiles.py — Several digests from one fetch + one LLM pass.
+
+Each entry in config.PROFILES is a named digest with its own keywords,
+categories, output file and article limit. The run fetches once with the
+union of every profile's keywords, dedups and classifies once, and then each
+profile picks its articles out of the shared results — so cost grows with
+the number of unique articles, not the number of profiles.
+"""
+
+import sys
+
+from fetchers import matches_keywords
+
+# PROFILES entry key → config setting it overrides
+_SETTINGS = {
+    "keywords": "PROFILE_KEYWORDS",
+    "categories": "PROFILE_CATEGORIES",
+    "output_file": "OUTPUT_FILE",
+    "max_articles": "MAX_ARTICLES_IN_DIGEST",
+}
+
+
+class ProfileConfig:
+    """The config module with one profile's settings layered on top; anything
+    not overridden falls through to config."""
+
+    def __init__(self, base, name, **overrides):
+        self._base = base
+        self.PROFILE = name
+        self.__dict__.update(overrides)
+
+    def __getattr__(self, attr):
+        return getattr(self._base, attr)
+
+
+def load(config, names=None):
+    """The profiles to build this run (all of them if `names` is empty), or []
+    when PROFILES isn't configured."""
+    defined = getattr(config, "PROFILES", {}) or {}
+    for name in names or []:
+        if name not in defined:
+            sys.exit(f"Unknown profile '{name}' — defined in config.py: {', '.join(defined) or 'none'}")
+
+    profiles = []
+    for name, settings in defined.items():
+        if names and name not in names:
+            continue
+        unknown = set(settings) - set(_SETTINGS)
+        if unknown:
+            sys.exit(f"Profile '{name}' has unknown settings: {', '.join(sorted(unknown))}")
+        overrides = {"PROFILE_KEYWORDS": None, "PROFILE_CATEGORIES": None}
+        overrides.update({_SETTINGS[k]: v for k, v in settings.items()})
+        overrides.setdefault("OUTPUT_FILE", f"{name}.html")
+        profiles.append(ProfileConfig(config, name, **overrides))
+    return profiles
+
+
+def shared_config(config, profiles):
+    """Config for the shared fetch + analysis: RSS keywords widened with every
+    profile's keywords, and a cap of all the profiles' limits added together.
+    The cap applies before the LLM pass, in fetch order, so a smaller one
+    would let the first-listed feeds crowd out profiles fed by the last."""
+    if not profiles:
+        return config
+    keywords = list(config.RSS_KEYWORDS)
+    for p in profiles:
+        keywords += [k for k in p.PROFILE_KEYWORDS or [] if k not in keywords]
+    cap = max(config.MAX_ARTICLES_IN_DIGEST, sum(p.MAX_ARTICLES_IN_DIGEST for p in profiles))
+    return ProfileConfig(config, "shared", RSS_KEYWORDS=keywords, MAX_ARTICLES_IN_DIGEST=cap)
+
+
+def select(articles, profile):
+    """The profile's share of the analyzed articles, in LLM order. The Article
+    objects are shared between profiles, not copied."""
+    keywords = [k.lower() for k in profile.PROFILE_KEYWORDS] if profile.PROFILE_KEYWORDS else None
+    categories = set(profile.PROFILE_CATEGORIES or ())
+    picked = [
+        a for a in articles
+        if (not categories or a.category in categories)
+        and (keywords is None or matches_keywords(a.title + " " + a.summary, keywords))
+    ]
+    return picked[:profile.MAX_ARTICLES_IN_DIGEST]
@@ -3,6 +3,13 @@ renderer.py — Turn categorized articles into a beautiful HTML digest.
 """
 
 import datetime
+import gzip
+import json
+import pathlib
+import re
+from html import escape
+
+import search_index
 
 CATEGORY_META = {
     "approval":  {"label": "Approvals & Regulatory", "icon": "✦", "color": "#4a9eff"},
@@ -17,79 +24,34 @@ CATEGORY_META = {
 
 CATEGORY_ORDER = ["approval", "funding", "research", "neuro_ai", "product", "ai_tool", "policy", "other"]
 
-
-def render(articles, config, output_path):
-    today = datetime.date.today().strftime("%B %d, %Y")
-    source_label = {"rss": "RSS Feeds", "google": "Google Search", "bing": "Bing News"}.get(config.SOURCE, config.SOURCE)
-
-    # Group by category
-    grouped = {cat: [] for cat in CATEGORY_ORDER}
-    for a in articles:
-        cat = a.get("category", "other").lower()
-        if cat not in grouped:
-            cat = "other"
-        grouped[cat].append(a)
-
-    # Build sections HTML
-    sections_html = ""
-    total = 0
-    for cat in CATEGORY_ORDER:
-        items = grouped[cat]
-        if not items:
-            continue
-        total += len(items)
-        meta = CATEGORY_META[cat]
-        cards = ""
-        for a in items:
-            cards += f"""
-            <a class="card" href="{a.get('url','#')}" target="_blank" rel="noopener">
-                <div class="card-source">{a.get('source','')}</div>
-                <div class="card-title">{a.get('title','')}</div>
-                <div class="card-summary">{a.get('one_line_summary', a.get('summary',''))}</div>
-                <div class="card-arrow">→</div>
-            </a>"""
-
-        sections_html += f"""
-        <section class="category" data-cat="{cat}">
-            <div class="cat-header">
-                <span class="cat-icon" style="color:{meta['color']}">{meta['icon']}</span>
-                <h2 class="cat-title">{meta['label']}</h2>
-                <span class="cat-count" style="background:{meta['color']}20;color:{meta['color']}">{len(items)}</span>
-            </div>
-            <div class="cards">{cards}</div>
-        </section>"""
-
-    html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-<meta charset="UTF-8">
-<meta name="viewport" content="width=device-width,initial-scale=1">
-<title>Neurotech & AI Signal — {today}</title>
-<link rel="preconnect" href="https://fonts.googleapis.com">
+# Web fonts are only pulled in for the local (dev) page; the production page
+# relies on the system font stack so it has no render-blocking requests.
+FONT_LINKS = """<link rel="preconnect" href="https://fonts.googleapis.com">
 <link href="https://fonts.googleapis.com/css2?family=Space+Mono:wght@400;700&family=Instrument+Serif:ital@0;1&display=swap" rel="stylesheet">
-<style>@import url('https://fonts.cdnfonts.com/css/helvetica-neue-55');</style>
-<style>
-  *, *::before, *::after {{ box-sizing: border-box; margin: 0; padding: 0; }}
+<style>@import url('https://fonts.cdnfonts.com/css/helvetica-neue-55');</style>"""
 
-  :root {{
+CSS = """
+  *, *::before, *::after { box-sizing: border-box; margin: 0; padding: 0; }
+
+  :root {
     --bg: #0a0a0f;
     --surface: #111118;
     --border: #1e1e2e;
     --text: #e8e8f0;
     --muted: #5a5a7a;
     --accent: #4a9eff;
-  }}
+  }
 
-  body {{
+  body {
     background: var(--bg);
     color: var(--text);
     font-family: 'Helvetica Neue', Helvetica, Arial, sans-serif;
     min-height: 100vh;
     padding: 0 0 80px;
-  }}
+  }
 
   /* Scanline overlay */
-  body::before {{
+  body::before {
     content: '';
     position: fixed;
     inset: 0;
@@ -102,16 +64,16 @@ def render(articles, config, output_path):
     );
     pointer-events: none;
     z-index: 999;
-  }}
+  }
 
-  header {{
+  header {
     border-bottom: 1px solid var(--border);
     padding: 48px 64px 32px;
     position: relative;
     overflow: hidden;
-  }}
+  }
 
-  header::after {{
+  header::after {
     content: 'NEURO × AI';
     position: absolute;
     right: -20px;
@@ -123,75 +85,84 @@ def render(articles, config, output_path):
     letter-spacing: -4px;
     pointer-events: none;
     user-select: none;
-  }}
+  }
 
-  .header-meta {{
+  .header-meta {
     font-size: 10px;
     letter-spacing: 4px;
     text-transform: uppercase;
     color: var(--muted);
     margin-bottom: 16px;
-  }}
+  }
 
-  h1 {{
+  h1 {
     font-family: 'Helvetica Neue', Helvetica, Arial, sans-serif;
     font-size: clamp(36px, 5vw, 64px);
     font-weight: 400;
     font-style: italic;
     letter-spacing: -1px;
     line-height: 1.1;
-  }}
+  }
 
-  h1 span {{
+  h1 span {
     color: var(--accent);
     font-style: normal;
-  }}
+  }
 
-  .header-stats {{
+  .header-stats {
     margin-top: 24px;
     display: flex;
     gap: 32px;
     flex-wrap: wrap;
-  }}
+  }
 
-  .stat {{
+  .stat {
     display: flex;
     flex-direction: column;
     gap: 2px;
-  }}
+  }
 
-  .stat-value {{
+  .stat-value {
     font-size: 24px;
     font-weight: 700;
     color: var(--accent);
-  }}
+  }
 
-  .stat-label {{
+  .stat-label {
     font-size: 10px;
     letter-spacing: 3px;
     text-transform: uppercase;
     color: var(--muted);
-  }}
+  }
+
+  /* Shown when --deadline had to cut corners */
+  .degraded {
+    padding: 14px 64px;
+    border-bottom: 1px solid var(--border);
+    color: #ffd166;
+    font-size: 12px;
+    letter-spacing: 1px;
+  }
 
   /* Filter bar */
-  .filter-bar {{
+  .filter-bar {
     padding: 20px 64px;
     border-bottom: 1px solid var(--border);
     display: flex;
     gap: 8px;
     flex-wrap: wrap;
     align-items: center;
-  }}
+  }
 
-  .filter-label {{
+  .filter-label {
     font-size: 10px;
     letter-spacing: 3px;
     text-transform: uppercase;
     color: var(--muted);
     margin-right: 8px;
-  }}
+  }
 
-  .filter-btn {{
+  .filter-btn {
     background: none;
     border: 1px solid var(--border);
     color: var(--muted);
@@ -201,57 +172,57 @@ def render(articles, config, output_path):
     letter-spacing: 1px;
     cursor: pointer;
     transition: all 0.15s;
-  }}
+  }
 
-  .filter-btn:hover, .filter-btn.active {{
+  .filter-btn:hover, .filter-btn.active {
     border-color: var(--accent);
     color: var(--accent);
-  }}
+  }
 
   /* Main content */
-  main {{
+  main {
     max-width: 1200px;
     margin: 0 auto;
     padding: 48px 64px 0;
-  }}
+  }
 
-  .category {{ margin-bottom: 56px; }}
+  .category { margin-bottom: 56px; }
 
-  .cat-header {{
+  .cat-header {
     display: flex;
     align-items: center;
     gap: 12px;
     margin-bottom: 20px;
     padding-bottom: 12px;
     border-bottom: 1px solid var(--border);
-  }}
+  }
 
-  .cat-icon {{ font-size: 20px; }}
+  .cat-icon { font-size: 20px; }
 
-  .cat-title {{
+  .cat-title {
     font-family: 'Helvetica Neue', Helvetica, Arial, sans-serif;
     font-size: 14px;
     font-weight: 700;
     letter-spacing: 3px;
     text-transform: uppercase;
     color: var(--text);
-  }}
+  }
 
-  .cat-count {{
+  .cat-count {
     font-size: 11px;
     padding: 2px 8px;
     border-radius: 2px;
     font-weight: 700;
-  }}
+  }
 
-  .cards {{
+  .cards {
     display: grid;
     grid-template-columns: repeat(auto-fill, minmax(320px, 1fr));
     gap: 1px;
     background: var(--border);
-  }}
+  }
 
-  .card {{
+  .card {
     display: block;
     background: var(--surface);
     padding: 20px 24px;
@@ -260,39 +231,39 @@ def render(articles, config, output_path):
     position: relative;
     transition: background 0.15s;
     overflow: hidden;
-  }}
+  }
 
-  .card:hover {{ background: #16161f; }}
+  .card:hover { background: #16161f; }
 
-  .card:hover .card-arrow {{
+  .card:hover .card-arrow {
     opacity: 1;
     transform: translateX(0);
-  }}
+  }
 
-  .card-source {{
+  .card-source {
     font-size: 11px;
     letter-spacing: 3px;
     text-transform: uppercase;
     color: var(--muted);
     margin-bottom: 8px;
-  }}
+  }
 
-  .card-title {{
+  .card-title {
     font-family: 'Helvetica Neue', Helvetica, Arial, sans-serif;
     font-size: 20px;
     line-height: 1.35;
     color: var(--text);
     margin-bottom: 10px;
-  }}
+  }
 
-  .card-summary {{
+  .card-summary {
     font-size: 14px;
     line-height: 1.7;
     color: #7878a0;
     padding-right: 20px;
-  }}
+  }
 
-  .card-arrow {{
+  .card-arrow {
     position: absolute;
     bottom: 20px;
     right: 20px;
@@ -301,17 +272,17 @@ def render(articles, config, output_path):
     opacity: 0;
     transform: translateX(-8px);
     transition: all 0.2s;
-  }}
+  }
 
-  .empty {{
+  .empty {
     text-align: center;
     padding: 80px 20px;
     color: var(--muted);
     font-size: 15px;
     letter-spacing: 2px;
-  }}
+  }
 
-  footer {{
+  footer {
     text-align: center;
     padding: 40px;
     color: var(--muted);
@@ -320,13 +291,141 @@ def render(articles, config, output_path):
     text-transform: uppercase;
     border-top: 1px solid var(--border);
     margin-top: 40px;
-  }}
+  }
 
-  @media (max-width: 768px) {{
-    header, .filter-bar, main {{ padding-left: 24px; padding-right: 24px; }}
-    header::after {{ display: none; }}
-  }}
-</style>
+  /* Archive search */
+  .search-box {
+    margin-left: auto;
+    background: none;
+    border: 1px solid var(--border);
+    color: var(--text);
+    padding: 6px 14px;
+    font-family: 'Helvetica Neue', Helvetica, Arial, sans-serif;
+    font-size: 13px;
+    min-width: 240px;
+  }
+
+  .search-box:focus {
+    outline: none;
+    border-color: var(--accent);
+  }
+
+  main.searching .category, main.searching .empty { display: none; }
+
+  .search-count {
+    font-size: 11px;
+    letter-spacing: 3px;
+    text-transform: uppercase;
+    color: var(--muted);
+    margin-bottom: 20px;
+  }
+
+  /* Chunked mode: placeholder that loads the rest of a category */
+  .more {
+    padding: 24px;
+    text-align: center;
+    color: var(--muted);
+    font-size: 11px;
+    letter-spacing: 3px;
+    text-transform: uppercase;
+  }
+
+  @media (max-width: 768px) {
+    header, .filter-bar, main { padding-left: 24px; padding-right: 24px; }
+    header::after { display: none; }
+  }
+"""
+
+
+def render(articles, config, output_path, notes=()):
+    return render_stream([articles], config, output_path, notes)
+
+
+def render_stream(batches, config, output_path, notes=()):
+    """Render from an iterable of analyzed article batches. The batches are
+    consumed first, grouping the Articles by category, and the HTML is built
+    once they're all in. Returns every rendered article.
+
+    `notes` (what was cut to meet a --deadline) are listed in a banner under
+    the header."""
+    today = datetime.date.today().strftime("%B %d, %Y")
+    source_label = {"rss": "RSS Feeds", "google": "Google Search", "bing": "Bing News"}.get(config.SOURCE, config.SOURCE)
+
+    # Group articles by category, building the machine-readable records in
+    # the same pass
+    feeds = getattr(config, "FEED_OUTPUT", True)
+    grouped = {cat: [] for cat in CATEGORY_ORDER}
+    rendered = []
+    records = []
+    for batch in batches:
+        for a in batch:
+            cat = a.category or "other"
+            if cat not in grouped:
+                cat = "other"
+            grouped[cat].append(a)
+            rendered.append(a)
+            if feeds:
+                records.append(_record(a, cat))
+
+    # Chunked mode: only the first screen of each category goes in the page;
+    # the rest is written as JSON chunks the page loads on demand
+    chunked = getattr(config, "CHUNKED_OUTPUT", False)
+    inline = getattr(config, "CHUNK_FIRST_SCREEN", 12) if chunked else None
+    chunk_script = ""
+    if chunked:
+        page = pathlib.Path(output_path)
+        chunk_dir = page.parent / config.CHUNK_DIR / page.stem
+        _clear_chunks(chunk_dir)
+        chunk_script = f"\n<script>{CHUNK_JS % {'base': f'{config.CHUNK_DIR}/{page.stem}'}}</script>"
+
+    search = getattr(config, "SEARCH_INDEX", False)
+    search_box = ('\n  <input class="search-box" type="search" placeholder="Search the archive…" '
+                  'aria-label="Search the archive" oninput="onSearch(this)">') if search else ""
+    search_results = '\n  <section id="search-results"></section>' if search else ""
+    search_script = f"\n<script>{search_index.page_script(config)}</script>" if search else ""
+
+    production = getattr(config, "PRODUCTION_OUTPUT", False)
+    fonts_html = "" if production else FONT_LINKS
+    css = _minify_css(CSS) if production else CSS
+    llm_label = ", ".join(sorted({a.backend for a in rendered} - {None})) or config.LLM_BACKEND
+    degraded = ""
+    if notes:
+        degraded = ('\n<div class="degraded">Published on a deadline, so this edition is incomplete: '
+                    + escape("; ".join(notes)) + ".</div>\n")
+
+    # Build sections HTML
+    sections_html = ""
+    total = 0
+    for cat in CATEGORY_ORDER:
+        items = grouped[cat]
+        if not items:
+            continue
+        total += len(items)
+        meta = CATEGORY_META[cat]
+        cards = "".join(_card_html(a) for a in items[:inline])
+        more = ""
+        if len(items) > len(items[:inline]):
+            chunks = _write_chunks(chunk_dir, cat, items[inline:], getattr(config, "CHUNK_SIZE", 50))
+            more = f'\n            <div class="more" data-cat="{cat}" data-chunks="{chunks}">Loading more…</div>'
+
+        sections_html += f"""
+        <section class="category" data-cat="{cat}">
+            <div class="cat-header">
+                <span class="cat-icon" style="color:{meta['color']}">{meta['icon']}</span>
+                <h2 class="cat-title">{meta['label']}</h2>
+                <span class="cat-count" style="background:{meta['color']}20;color:{meta['color']}">{len(items)}</span>
+            </div>
+            <div class="cards">{cards}</div>{more}
+        </section>"""
+
+    html = f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width,initial-scale=1">
+<title>Neurotech & AI Signal — {today}</title>
+{fonts_html}
+<style>{css}</style>
 </head>
 <body>
 
@@ -348,22 +447,22 @@ def render(articles, config, output_path):
     </div>
   </div>
 </header>
-
+{degraded}
 <div class="filter-bar">
   <span class="filter-label">Filter</span>
   <button class="filter-btn active" onclick="filterCat('all', this)">All</button>
   {"".join(
     f'<button class="filter-btn" onclick="filterCat(\'{cat}\', this)">{CATEGORY_META[cat]["icon"]} {CATEGORY_META[cat]["label"]}</button>'
     for cat in CATEGORY_ORDER if grouped[cat]
-  )}
+  )}{search_box}
 </div>
 
-<main>
+<main>{search_results}
   {"".join([f'<div class="empty">No articles found today. Try adjusting your RSS feeds or search queries in config.py.</div>' if total == 0 else sections_html])}
 </main>
 
 <footer>
-  Generated {datetime.datetime.now().strftime("%Y-%m-%d %H:%M")} · Source: {source_label} · LLM: {config.LLM_BACKEND}
+  Generated {datetime.datetime.now().strftime("%Y-%m-%d %H:%M")} · Source: {source_label} · LLM: {llm_label}
 </footer>
 
 <script>
@@ -378,12 +477,206 @@ function filterCat(cat, btn) {{
     }}
   }});
 }}
-</script>
+</script>{search_script}{chunk_script}
 
 </body>
 </html>"""
 
+    if production:
+        html = _minify_html(html)
+
     with open(output_path, "w", encoding="utf-8") as f:
         f.write(html)
 
     print(f"[render] Digest written to: {output_path}")
+    if feeds:
+        _write_feeds(output_path, records, config, today)
+    if search:
+        search_index.update(rendered, pathlib.Path(output_path).parent / config.SEARCH_INDEX_DIR, config)
+    if production:
+        _write_precompressed(output_path, html.encode("utf-8"))
+        check_budgets(html, config)
+    else:
+        # Copies left by an earlier --production run would be served instead
+        for suffix in (".gz", ".br"):
+            pathlib.Path(f"{output_path}{suffix}").unlink(missing_ok=True)
+    return rendered
+
+
+# ── JSON FEED / NDJSON ────────────────────────────────────────────────────────
+
+def _record(a, cat):
+    return {
+        "url": a.url,
+        "title": a.title,
+        "source": a.source,
+        "category": cat,
+        "summary": a.one_line_summary or a.summary,
+        "published": a.published.isoformat() if a.published else None,
+        "backend": a.backend,
+    }
+
+
+def _write_feeds(output_path, records, config, today):
+    """Write the page's articles as a JSON Feed 1.1 document (<page>.json) and
+    as one JSON object per line (<page>.ndjson), for consumers that would
+    otherwise scrape the HTML."""
+    page = pathlib.Path(output_path)
+    site = getattr(config, "SITE_URL", "")
+    feed = {
+        "version": "https://jsonfeed.org/version/1.1",
+        "title": "The Daily Signal — Neurotech & AI",
+        "description": f"Neurotech, neuro-AI and AI tools news for {today}",
+        "items": [_feed_item(r) for r in records],
+    }
+    if site:
+        feed["home_page_url"] = site
+    page.with_suffix(".json").write_text(json.dumps(feed, ensure_ascii=False), encoding="utf-8")
+    page.with_suffix(".ndjson").write_text(
+        "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records), encoding="utf-8")
+    print(f"[render] JSON Feed + NDJSON written: {len(records)} articles")
+
+
+def _feed_item(r):
+    # Source, category and backend don't map onto JSON Feed fields, so they
+    # go in an extension object (keys starting with "_" are ignored by readers)
+    item = {
+        "id": r["url"] or r["title"],
+        "url": r["url"],
+        "title": r["title"],
+        "content_text": r["summary"],
+        "summary": r["summary"],
+        "tags": [r["category"]],
+        "_digest": {"source": r["source"], "category": r["category"], "backend": r["backend"]},
+    }
+    if r["published"]:
+        item["date_published"] = r["published"]
+    return item
+
+
+def _clear_chunks(chunk_dir):
+    chunk_dir.mkdir(parents=True, exist_ok=True)
+    for stale in chunk_dir.glob("*.json"):
+        stale.unlink()
+
+
+def _write_chunks(chunk_dir, cat, articles, size):
+    """Write `articles` as <cat>-<n>.json files of `size` cards each; returns
+    the number of chunks."""
+    for n, start in enumerate(range(0, len(articles), size)):
+        cards = [[a.url or "#", a.source, a.title, a.one_line_summary or a.summary]
+                 for a in articles[start:start + size]]
+        (chunk_dir / f"{cat}-{n}.json").write_text(
+            json.dumps(cards, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    return -(-len(articles) // size)
+
+
+# Chunked-mode page script: each category's "more" placeholder loads its next
+# chunk when it scrolls near the viewport — which includes being revealed by a
+# filter button — and stays observed until the last chunk is in.
+CHUNK_JS = """
+const CHUNK_BASE = '%(base)s';
+const chunkEsc = s => String(s).replace(/[&<>"]/g, c => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'}[c]));
+const chunkObserver = new IntersectionObserver(entries => entries.forEach(e => e.isIntersecting && loadChunk(e.target)),
+  {rootMargin: '600px'});
+document.querySelectorAll('.more').forEach(el => chunkObserver.observe(el));
+
+async function loadChunk(el) {
+  if (el.dataset.loading) return;
+  el.dataset.loading = '1';
+  const next = +(el.dataset.next || 0);
+  chunkObserver.unobserve(el);
+  let cards;
+  try {
+    const r = await fetch(CHUNK_BASE + '/' + el.dataset.cat + '-' + next + '.json');
+    cards = await r.json();
+  } catch (e) {
+    el.textContent = 'More stories need the page served over http(s)';
+    return;
+  }
+  el.previousElementSibling.insertAdjacentHTML('beforeend', cards.map(([url, source, title, summary]) =>
+    '<a class="card" href="' + chunkEsc(url) + '" target="_blank" rel="noopener">'
+    + '<div class="card-source">' + chunkEsc(source) + '</div>'
+    + '<div class="card-title">' + chunkEsc(title) + '</div>'
+    + '<div class="card-summary">' + chunkEsc(summary) + '</div>'
+    + '<div class="card-arrow">→</div></a>').join(''));
+  el.dataset.next = next + 1;
+  delete el.dataset.loading;
+  // Re-observing fires again straight away if the placeholder is still in view
+  if (next + 1 < +el.dataset.chunks) chunkObserver.observe(el);
+  else el.remove();
+}
+"""
+
+
+def _card_html(a):
+    # Feed text is plain text (entities already decoded), so it's escaped
+    # here like the chunk and search scripts do on the client
+    return f"""
+            <a class="card" href="{escape(a.url or '#')}" target="_blank" rel="noopener">
+                <div class="card-source">{escape(a.source)}</div>
+                <div class="card-title">{escape(a.title)}</div>
+                <div class="card-summary">{escape(a.one_line_summary or a.summary or "")}</div>
+                <div class="card-arrow">→</div>
+            </a>"""
+
+
+# ── PRODUCTION OUTPUT ─────────────────────────────────────────────────────────
+
+def _minify_css(css):
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.DOTALL)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{}:;,>])\s*", r"\1", css)
+    return css.replace(";}", "}").strip()
+
+
+def _minify_html(html):
+    # Drop indentation and blank lines, then whitespace between tags. Newlines
+    # inside <script> survive, so the JS never depends on semicolon insertion.
+    html = re.sub(r"\n\s*", "\n", html)
+    return re.sub(r">\n+<", "><", html).strip()
+
+
+def _write_precompressed(output_path, data):
+    """Write .gz (and .br, if the brotli package is installed) next to the
+    page so static hosts can serve them without compressing on the fly."""
+    gz = gzip.compress(data, compresslevel=9, mtime=0)
+    with open(f"{output_path}.gz", "wb") as f:
+        f.write(gz)
+    sizes = f"{len(data) / 1024:.1f} KB → gzip {len(gz) / 1024:.1f} KB"
+
+    try:
+        import brotli
+    except ImportError:
+        print(f"[render] {sizes} (pip install brotli for a .br copy)")
+        return
+    br = brotli.compress(data, quality=11)
+    with open(f"{output_path}.br", "wb") as f:
+        f.write(br)
+    print(f"[render] {sizes}, brotli {len(br) / 1024:.1f} KB")
+
+
+def render_blocking_requests(html):
+    """External stylesheets, CSS @imports and synchronous external scripts."""
+    return (
+        re.findall(r"<link[^>]+rel=\"?stylesheet[^>]*>", html)
+        + re.findall(r"@import\s", html)
+        + [s for s in re.findall(r"<script[^>]+src=[^>]*>", html) if " async" not in s and " defer" not in s]
+    )
+
+
+def check_budgets(html, config):
+    """Warn when the page exceeds its size or render-blocking-request budget.
+    Returns the list of problems (empty when within budget)."""
+    problems = []
+    gz_kb = len(gzip.compress(html.encode("utf-8"), 9, mtime=0)) / 1024
+    budget_kb = getattr(config, "HTML_GZIP_BUDGET_KB", 30)
+    if gz_kb > budget_kb:
+        problems.append(f"gzipped page is {gz_kb:.1f} KB (budget {budget_kb} KB)")
+    blocking = render_blocking_requests(html)
+    budget_blocking = getattr(config, "RENDER_BLOCKING_BUDGET", 0)
+    if len(blocking) > budget_blocking:
+        problems.append(f"{len(blocking)} render-blocking requests (budget {budget_blocking})")
+    for p in problems:
+        print(f"[render] Over budget: {p}")
+    return problems
@@ -0,0 +1,335 @@
+"""
+resilience.py — Bounded-latency HTTP GETs for the fetchers.
+
+Every fetch goes through get(), which adds:
+  - per-source (connect, read, total) timeouts — the total bound holds even
+    when a server trickles bytes and never trips the read timeout
+  - bounded exponential-backoff retries (with jitter) on connection errors,
+    timeouts, 429 and 5xx, drawn from a per-run retry budget so a bad
+    morning can't turn into a retry storm
+  - optional hedging for known-slow hosts: if the first request hasn't
+    answered after N seconds, an identical one is sent and the first
+    response wins
+  - a circuit breaker persisted across runs: a source that has failed
+    FETCH_BREAKER_THRESHOLD times in a row is skipped until its cool-down
+    ends, then gets one trial request
+
+Worst case per source is (FETCH_RETRIES + 1) × total timeout + backoff, so
+the fetch stage's tail latency is set by config, not by the slowest server.
+
+Requests go out through the standard library (urllib.request) rather than
+the requests package: importing requests costs about as much as the rest of
+startup together, and a feed GET needs none of what it adds. The stdlib
+HTTP modules are imported on the first request.
+"""
+
+import json
+import queue
+import random
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit
+
+import metrics
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpen(Exception):
+    """The source failed repeatedly and is cooling down — skipped this run."""
+
+
+class FetchTimeout(Exception):
+    """No response within the source's total time budget."""
+
+
+class HTTPError(Exception):
+    """The server answered with a 4xx/5xx status."""
+
+
+class Response:
+    """The parts of a response the fetchers use (a subset of requests.Response)."""
+
+    def __init__(self, url, status_code, headers, content):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers   # email.message.Message — case-insensitive .get()
+        self.content = content
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise HTTPError(f"{self.status_code} for {self.url}")
+
+
+USER_AGENT = "NeurotechDigest/1.0 (+https://github.com/chichi-chang/daily_neurotech_ai)"
+
+_opener = None
+_context = None
+_lock = threading.Lock()
+_retries_left = None
+_breaker = None
+
+
+def get(url, kind, config, params=None, headers=None, breaker_key=None):
+    """GET `url` and return its Response (status already checked).
+
+    `kind` ("rss", "hn", "google", "bing") picks the timeout when the host
+    has none of its own; `breaker_key` groups requests that share a circuit
+    (e.g. every HN query hits one API) and defaults to the URL."""
+    key = breaker_key or url
+    try:
+        _check_breaker(key, config)
+    except CircuitOpen:
+        metrics.inc("http_requests", kind=kind, outcome="circuit_open")
+        raise
+    # Client setup happens outside the recorded block, and only network and
+    # HTTP errors count against the host: a local bug or missing module
+    # would otherwise open the circuit on every source at once
+    _get_opener()
+    try:
+        resp = _get_with_retries(url, kind, config, params, headers)
+    except (*_network_errors(), HTTPError):
+        _record(key, False, config)
+        metrics.inc("http_requests", kind=kind, outcome="error")
+        raise
+    _record(key, True, config)
+    metrics.inc("http_requests", kind=kind, outcome="ok")
+    metrics.inc("http_response_bytes", len(resp.content), kind=kind)
+    return resp
+
+
+def _get_opener():
+    """One shared opener: redirects, proxies from the environment, and
+    connections that keep the connect and read timeouts apart (urllib alone
+    has one socket timeout for both). The classes are defined here so
+    http.client is only imported on the first request."""
+    global _opener
+    import functools
+    import http.client
+    import urllib.request
+
+    class Connection(http.client.HTTPConnection):
+        # Opened with the connect timeout (req.timeout); reads get read_timeout
+        def __init__(self, host, read_timeout=None, **kwargs):
+            super().__init__(host, **kwargs)
+            self.read_timeout = read_timeout
+            self.tls_host = None
+
+        def set_tunnel(self, host, port=None, headers=None):
+            self.tls_host = urlsplit("//" + host).hostname   # urllib passes "host:port"
+            super().set_tunnel(host, port, headers)
+
+        def connect(self):
+            super().connect()
+            self.sock.settimeout(self.read_timeout)
+
+    class TLSConnection(Connection):
+        # TLS over Connection, so the SSLContext is only built (CA bundle
+        # loaded) once the first HTTPS connection is up
+        default_port = http.client.HTTPS_PORT
+
+        def connect(self):
+            http.client.HTTPConnection.connect(self)   # TCP, and the proxy tunnel if any
+            self.sock = _ssl_context().wrap_socket(self.sock, server_hostname=self.tls_host or self.host)
+            self.sock.settimeout(self.read_timeout)
+
+    class HTTPHandler(urllib.request.HTTPHandler):
+        def http_open(self, req):
+            return self.do_open(functools.partial(Connection, read_timeout=req.read_timeout), req)
+
+    class HTTPSHandler(urllib.request.HTTPSHandler):
+        def __init__(self):
+            # Skips HTTPSHandler's own set-up, which builds a context up front
+            urllib.request.AbstractHTTPHandler.__init__(self)
+
+        def https_open(self, req):
+            return self.do_open(functools.partial(TLSConnection, read_timeout=req.read_timeout), req)
+
+    with _lock:
+        if _opener is None:
+            _opener = urllib.request.build_opener(HTTPHandler(), HTTPSHandler())
+    return _opener
+
+
+def _ssl_context():
+    """The shared SSLContext, built on first use. Loading a CA bundle takes
+    ~30 ms; SSL_CERT_FILE / SSL_CERT_DIR and the system store win, with
+    certifi's bundle as the fallback (found by path — importing certifi
+    pulls in importlib.resources for no gain here)."""
+    global _context
+    import importlib.util
+    import ssl
+
+    with _lock:
+        if _context is None:
+            context = ssl.create_default_context()
+            if not context.cert_store_stats()["x509_ca"]:
+                spec = importlib.util.find_spec("certifi")
+                bundle = spec and Path(spec.origin).with_name("cacert.pem")
+                if bundle and bundle.exists():
+                    context.load_verify_locations(cafile=bundle)
+            context.set_alpn_protocols(["http/1.1"])
+            _context = context
+    return _context
+
+
+def _fetch(url, params, headers, connect, read):
+    """One GET → Response, whatever the status; network errors are raised."""
+    import urllib.error
+    import urllib.request
+
+    if params:
+        url += ("&" if "?" in url else "?") + urlencode(params)
+    request = urllib.request.Request(url, headers={
+        "User-Agent": USER_AGENT, "Accept-Encoding": "gzip", **(headers or {})})
+    request.read_timeout = read
+    try:
+        resp = _get_opener().open(request, timeout=connect)
+    except urllib.error.HTTPError as e:
+        resp = e   # 4xx/5xx still carry a status, headers and body
+    with resp:
+        content = resp.read()
+        if resp.headers.get("Content-Encoding") == "gzip":
+            import gzip
+            content = gzip.decompress(content)
+        return Response(resp.geturl(), resp.status, resp.headers, content)
+
+
+def _network_errors():
+    """No answer, or a broken one — what's worth a retry."""
+    import http.client
+    import urllib.error
+
+    return (urllib.error.URLError, http.client.HTTPException, OSError, FetchTimeout)
+
+
+# ── RETRIES ───────────────────────────────────────────────────────────────────
+
+def _get_with_retries(url, kind, config, params, headers):
+    retries = getattr(config, "FETCH_RETRIES", 2)
+    base = getattr(config, "FETCH_BACKOFF", 0.5)
+    cap = getattr(config, "FETCH_BACKOFF_MAX", 4.0)
+
+    for attempt in range(retries + 1):
+        last = attempt == retries
+        retry_after = None
+        try:
+            resp = _hedged_get(url, kind, config, params, headers)
+            if resp.status_code not in RETRY_STATUSES or last or not _take_retry(config):
+                resp.raise_for_status()
+                return resp
+            retry_after = resp.headers.get("Retry-After")
+        except _network_errors():
+            if last or not _take_retry(config):
+                raise
+
+        delay = min(cap, base * 2 ** attempt) * random.uniform(0.5, 1.0)
+        if retry_after and retry_after.isdigit():
+            delay = min(cap, float(retry_after))
+        time.sleep(delay)
+
+
+def _take_retry(config):
+    """Spend one retry from the per-run budget; False once it's used up."""
+    global _retries_left
+    with _lock:
+        if _retries_left is None:
+            _retries_left = getattr(config, "FETCH_RETRY_BUDGET", 20)
+        if _retries_left <= 0:
+            return False
+        _retries_left -= 1
+        return True
+
+
+# ── TIMEOUTS + HEDGING ────────────────────────────────────────────────────────
+
+def _timeouts(url, kind, config):
+    table = getattr(config, "FETCH_TIMEOUTS", {})
+    host = urlsplit(url).hostname or ""
+    return table.get(host) or table.get(kind) or table.get("default", (3.05, 10, 20))
+
+
+def _hedged_get(url, kind, config, params, headers):
+    """One attempt. Runs in daemon threads so an attempt that blows its total
+    budget is abandoned rather than waited on; with a hedge delay for the
+    host, a duplicate request races the first and the first response wins."""
+    connect, read, total = _timeouts(url, kind, config)
+    hedge_after = getattr(config, "FETCH_HEDGE_HOSTS", {}).get(urlsplit(url).hostname or "")
+    results = queue.Queue()
+
+    def run():
+        try:
+            results.put((_fetch(url, params, headers, connect, read), None))
+        except Exception as e:
+            results.put((None, e))
+
+    start = time.monotonic()
+    threading.Thread(target=run, daemon=True).start()
+    launched, failed = 1, 0
+    while True:
+        wake = start + total
+        if hedge_after and launched == 1:
+            wake = min(wake, start + hedge_after)
+        try:
+            resp, err = results.get(timeout=max(0.0, wake - time.monotonic()))
+        except queue.Empty:
+            if time.monotonic() >= start + total:
+                raise FetchTimeout(f"no response within {total}s")
+            threading.Thread(target=run, daemon=True).start()
+            launched += 1
+            continue
+        if err is None:
+            return resp
+        failed += 1
+        if failed >= launched:
+            raise err
+
+
+# ── CIRCUIT BREAKER ───────────────────────────────────────────────────────────
+
+def _breaker_path(config):
+    return Path(__file__).parent / getattr(config, "FETCH_BREAKER_FILE", ".fetch_breaker.json")
+
+
+def _load_breaker(config):
+    global _breaker
+    if _breaker is None:
+        try:
+            _breaker = json.loads(_breaker_path(config).read_text())
+        except (OSError, ValueError):
+            _breaker = {}
+    return _breaker
+
+
+def _check_breaker(key, config):
+    with _lock:
+        state = _load_breaker(config).get(key)
+    if state and state.get("open_until", 0) > time.time():
+        until = time.strftime("%Y-%m-%d %H:%M", time.localtime(state["open_until"]))
+        raise CircuitOpen(f"{state['failures']} failures in a row — skipped until {until}")
+
+
+def _record(key, ok, config):
+    with _lock:
+        breaker = _load_breaker(config)
+        state = breaker.get(key)
+        if ok:
+            if not state:
+                return
+            del breaker[key]
+        else:
+            state = state or {"failures": 0, "open_until": 0}
+            state["failures"] += 1
+            if state["failures"] >= getattr(config, "FETCH_BREAKER_THRESHOLD", 3):
+                # Open (or re-open after a failed trial request)
+                cooldown = getattr(config, "FETCH_BREAKER_COOLDOWN_HOURS", 6) * 3600
+                state["open_until"] = time.time() + cooldown
+            breaker[key] = state
+        path = _breaker_path(config)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(breaker, indent=1))
+        tmp.replace(path)
@@ -6,25 +6,38 @@ Usage:
   python run.py              # fetch + analyze + open digest
   python run.py --no-open    # fetch + analyze, don't open browser
   python run.py --fetch-only # just print raw fetched articles (debug)
+  python run.py --pipeline   # overlap fetching and LLM analysis
+  python run.py --production # minified, self-contained, pre-compressed page
+  python run.py --chunked    # first screen inline, the rest loaded on scroll
+  python run.py --profile neurotech  # build one digest profile from PROFILES
+  python run.py --deadline 07:55    # publish by 07:55, degrading if need be
+  python run.py trends --category funding --keyword bci --since 90d  # history
+  python run.py batch submit --history --since 90d  # re-classify via batch API
+  python run.py batch poll   # wait for batch results, merge them into history
 """
 
 import argparse
-import os
-import subprocess
 import sys
-import tempfile
-import shutil
-import webbrowser
 import pathlib
 
 import config
-import fetchers
-import llm
-import renderer
 
+# Pipeline modules (and the third-party packages they pull in) are imported
+# inside main() only once the chosen code path needs them, so --help and
+# cron restarts don't pay for them.
+
+
+def deploy_to_gh_pages(html_path: pathlib.Path, extra_pages=(), timeout=None):
+    """Push digest.html to the gh-pages branch for GitHub Pages hosting, along
+    with any pre-compressed .gz/.br copies, the JSON Feed / NDJSON files and
+    the search index the renderer wrote next to it, and the lazy-loaded card
+    chunks in chunked mode.
+    `extra_pages` (other profiles' digests) are published under their own
+    file names. The push is killed after `timeout` seconds."""
+    import shutil
+    import subprocess
+    import tempfile
 
-def deploy_to_gh_pages(html_path: pathlib.Path):
-    """Push digest.html to the gh-pages branch for GitHub Pages hosting."""
     repo_root = pathlib.Path(__file__).parent
 
     remote_url = subprocess.check_output(
@@ -36,9 +49,26 @@ def deploy_to_gh_pages(html_path: pathlib.Path):
         subprocess.run(["git", "init", "-b", "gh-pages"], cwd=tmp, check=True,
                        capture_output=True)
 
-        shutil.copy(html_path, tmp / "index.html")
+        for page, name in [(html_path, "index.html")] + [(p, p.name) for p in extra_pages]:
+            shutil.copy(page, tmp / name)
+            for suffix in (".gz", ".br"):
+                compressed = page.with_name(page.name + suffix)
+                if getattr(config, "PRODUCTION_OUTPUT", False) and compressed.exists():
+                    shutil.copy(compressed, tmp / f"{name}{suffix}")
+            # index.html gets index.json / index.ndjson next to it
+            for suffix in (".json", ".ndjson"):
+                data = page.with_suffix(suffix)
+                if getattr(config, "FEED_OUTPUT", True) and data.exists():
+                    shutil.copy(data, tmp / pathlib.Path(name).with_suffix(suffix))
+        if getattr(config, "SEARCH_INDEX", False):
+            shutil.copytree(html_path.parent / config.SEARCH_INDEX_DIR, tmp / config.SEARCH_INDEX_DIR)
+        if getattr(config, "CHUNKED_OUTPUT", False):
+            # Each page's chunks sit under its original file name, which is
+            # what the page's script asks for even when published as index.html
+            for page in [html_path, *extra_pages]:
+                shutil.copytree(page.parent / config.CHUNK_DIR / page.stem, tmp / config.CHUNK_DIR / page.stem)
 
-        subprocess.run(["git", "add", "index.html"], cwd=tmp, check=True,
+        subprocess.run(["git", "add", "-A"], cwd=tmp, check=True,
                        capture_output=True)
         subprocess.run(
             ["git", "commit", "-m", f"Update digest"],
@@ -47,7 +77,93 @@ def deploy_to_gh_pages(html_path: pathlib.Path):
         subprocess.run(["git", "remote", "add", "origin", remote_url], cwd=tmp,
                        check=True, capture_output=True)
         subprocess.run(["git", "push", "--force", "origin", "gh-pages"], cwd=tmp,
-                       check=True, capture_output=True)
+                       check=True, capture_output=True, timeout=timeout)
+
+
+def _report_filtered(articles, analyzed):
+    print(f"[llm] {len(analyzed)} articles passed relevance filter")
+
+    rejected = [a for a in articles if a.category is None]
+    if rejected:
+        print(f"[llm] {len(rejected)} articles filtered out:")
+        for a in rejected:
+            print(f"       ✗ [{a.source}] {a.title}")
+
+    if not analyzed:
+        print("[!] LLM returned no relevant articles.")
+        print("    Try: python run.py --fetch-only  to check raw fetched articles")
+        sys.exit(1)
+
+
+def _since(value):
+    """--since as an ISO date; "90d" means 90 days ago."""
+    import datetime
+
+    if value and value[:-1].isdigit() and value.endswith("d"):
+        return (datetime.date.today() - datetime.timedelta(days=int(value[:-1]))).isoformat()
+    return value
+
+
+def _trends(args):
+    """Print article counts per period (or the top values) from the history DB."""
+    import time
+
+    import store
+
+    filters = dict(category=args.category, source=args.source, keyword=args.keyword,
+                   since=_since(args.since), until=args.until)
+
+    conn = store.connect(config)
+    start = time.perf_counter()
+    try:
+        if args.top:
+            rows = store.top(conn, args.top, args.limit, **filters)
+        else:
+            rows = store.trend(conn, args.by, **filters)
+    except ValueError as e:
+        sys.exit(f"[trends] {e}")
+    elapsed = (time.perf_counter() - start) * 1000
+    conn.close()
+
+    described = ", ".join(f"{k}={v}" for k, v in filters.items() if v) or "all articles"
+    print(f"{'Top ' + args.top if args.top else 'Articles per ' + args.by} ({described}):")
+    widest = max((n for _, n in rows), default=0)
+    for label, n in rows:
+        print(f"  {label:<24} {n:>6}  {'█' * max(1, round(n / widest * 40))}")
+    if not rows:
+        print("  (no matching articles)")
+    print(f"[trends] {len(rows)} rows in {elapsed:.1f} ms")
+
+
+def _batch(args):
+    """Submit articles to a provider's batch API, or poll / list the jobs."""
+    import batch
+    import llm
+
+    try:
+        if args.action == "status":
+            return batch.status(config)
+        if args.action == "poll":
+            sys.exit(1 if batch.poll(config, once=args.once, retry_failed=args.retry_failed) else 0)
+
+        if args.history:
+            import store
+
+            conn = store.connect(config)
+            articles = store.load(conn, category=args.category, source=args.source,
+                                  since=_since(args.since), until=args.until)
+            conn.close()
+            print(f"[batch] {len(articles)} articles from the history to re-classify")
+        else:
+            import fetchers
+
+            articles = fetchers.fetch_articles(config)
+        if not articles:
+            sys.exit("[batch] Nothing to submit")
+        batch.submit(articles, config, backend=args.backend)
+        print("[batch] Run `python run.py batch poll` to collect the results")
+    except llm.BackendError as e:
+        sys.exit(f"[batch] {e}")
 
 
 def main():
@@ -56,52 +172,183 @@ def main():
     parser.add_argument("--fetch-only", action="store_true", help="Only fetch, skip LLM")
     parser.add_argument("--deploy",     action="store_true",
                         help="Push digest to GitHub Pages after generating")
+    parser.add_argument("--pipeline",   action="store_true",
+                        help="Overlap fetching and LLM analysis")
+    parser.add_argument("--production", action="store_true",
+                        help="Minified, self-contained page with .gz/.br copies")
+    parser.add_argument("--chunked",    action="store_true",
+                        help="Inline the first screen per category, lazy-load the rest")
+    parser.add_argument("--profile",    action="append", metavar="NAME",
+                        help="Only build this digest profile (repeatable; default: all in PROFILES)")
+    parser.add_argument("--deadline",   metavar="SECONDS|HH:MM",
+                        help="Publish within this many seconds or by this time today, "
+                             "cutting sources / LLM work as needed")
+    commands = parser.add_subparsers(dest="command", metavar="{trends,batch}")
+    trends = commands.add_parser("trends", help="Article counts over time from the history DB")
+    trends.add_argument("--by", default="week", choices=["day", "week", "month", "year"])
+    trends.add_argument("--category", help="e.g. funding, research, neuro_ai")
+    trends.add_argument("--source",   help="exact source name, e.g. STAT")
+    trends.add_argument("--keyword",  help="a matched RSS keyword, e.g. bci")
+    trends.add_argument("--since",    help="YYYY-MM-DD, or e.g. 90d for the last 90 days")
+    trends.add_argument("--until",    help="YYYY-MM-DD (inclusive)")
+    trends.add_argument("--top",      choices=["category", "source", "keyword"],
+                        help="Rank values instead of counting per period")
+    trends.add_argument("--limit",    type=int, default=10)
+    batches = commands.add_parser("batch", help="Classify in bulk through the provider batch APIs")
+    batches.add_argument("action", choices=["submit", "poll", "status"])
+    batches.add_argument("--backend",  choices=["claude", "openai"],
+                         help="default: first of them in LLM_BACKEND(S)")
+    batches.add_argument("--history",  action="store_true",
+                         help="submit: re-classify articles from the history DB instead of fetching")
+    batches.add_argument("--category", help="--history: only this category")
+    batches.add_argument("--source",   help="--history: only this source")
+    batches.add_argument("--since",    help="--history: YYYY-MM-DD, or e.g. 90d")
+    batches.add_argument("--until",    help="--history: YYYY-MM-DD (inclusive)")
+    batches.add_argument("--once",     action="store_true",
+                         help="poll: check once instead of waiting (exit 1 if jobs are still running)")
+    batches.add_argument("--retry-failed", action="store_true",
+                         help="poll: also poll jobs marked failed by an earlier poll")
     args = parser.parse_args()
+    config.load()
+    if args.command == "trends":
+        return _trends(args)
+    if args.command == "batch":
+        return _batch(args)
+    if args.fetch_only:
+        return _digest(args)
+
+    import metrics
+
+    ok = False
+    try:
+        with metrics.timer("total"):
+            _digest(args)
+        ok = True
+    finally:
+        metrics.write(config, ok)
+
+
+def _digest(args):
+    if args.production:
+        config.PRODUCTION_OUTPUT = True
+    if args.chunked:
+        config.CHUNKED_OUTPUT = True
+
+    import deadline
+    import metrics
+    import profiles
+
+    if args.deadline:
+        deadline.start(deadline.parse(args.deadline))
+
+    # With PROFILES configured, fetch + analysis run once with the union of
+    # the profiles' settings and each profile is rendered from the results.
+    selected = profiles.load(config, args.profile)
+    shared = profiles.shared_config(config, selected)
 
     print("=" * 50)
     print("  THE DAILY SIGNAL — Neurotech & AI")
     print("=" * 50)
 
-    # 1. Fetch
-    articles = fetchers.fetch_articles(config)
+    output_path = pathlib.Path(__file__).parent / config.OUTPUT_FILE
 
-    if not articles:
-        print("[!] No articles fetched. Check your config and network.")
-        sys.exit(1)
+    if args.pipeline and not args.fetch_only:
+        import pipeline
+        import renderer
 
-    if args.fetch_only:
-        print(f"\nFetched {len(articles)} articles:\n")
-        for a in articles:
-            print(f"  [{a['source']}] {a['title']}")
-            print(f"    {a['url']}\n")
-        return
-
-    # 2. LLM analysis
-    analyzed = llm.analyze(articles, config)
-    print(f"[llm] {len(analyzed)} articles passed relevance filter")
+        # 1–2. Fetch and analyze concurrently
+        articles = []
+        with metrics.timer("pipeline"):
+            analyzed = [a for batch in pipeline.stream(shared, articles) for a in batch]
+        metrics.gauge("articles", len(articles), stage="fetched")
+        metrics.gauge("articles", len(analyzed), stage="analyzed")
+        metrics.gauge("degraded", len(deadline.notes))
+        # Checked before anything is written, so an empty run leaves the
+        # last good digest and its feeds in place
+        if not articles:
+            print("[!] No articles fetched. Check your config and network.")
+            sys.exit(1)
+        _report_filtered(articles, analyzed)
 
-    kept_urls = {a.get("url") for a in analyzed}
-    rejected = [a for a in articles if a["url"] not in kept_urls]
-    if rejected:
-        print(f"[llm] {len(rejected)} articles filtered out:")
-        for a in rejected:
-            print(f"       ✗ [{a['source']}] {a['title']}")
+        # 3. Render
+        if not selected:
+            with metrics.timer("render"):
+                renderer.render(analyzed, config, output_path, deadline.notes)
+            metrics.inc("articles", len(analyzed), stage="rendered")
+    else:
+        import fetchers
 
-    if not analyzed:
-        print("[!] LLM returned no relevant articles.")
-        print("    Try: python run.py --fetch-only  to check raw fetched articles")
-        sys.exit(1)
+        if args.fetch_only:
+            # Print each article as its feed is parsed
+            count = 0
+            for count, a in enumerate(fetchers.iter_articles(shared), 1):
+                print(f"  [{a.source}] {a.title}")
+                print(f"    {a.url}\n")
+            if not count:
+                print("[!] No articles fetched. Check your config and network.")
+                sys.exit(1)
+            print(f"\nFetched {count} articles")
+            return
 
-    # 3. Render
-    output_path = pathlib.Path(__file__).parent / config.OUTPUT_FILE
-    renderer.render(analyzed, config, output_path)
+        # 1. Fetch (concurrently under a deadline, so a hung feed can be cut)
+        with metrics.timer("fetch"):
+            if deadline.active():
+                articles = list(fetchers.iter_articles(shared, workers=getattr(config, "FETCH_WORKERS", 8),
+                                                       until=deadline.stage_end("fetch", shared)))
+            else:
+                articles = fetchers.fetch_articles(shared)
+        metrics.gauge("articles", len(articles), stage="fetched")
+
+        if not articles:
+            print("[!] No articles fetched. Check your config and network.")
+            sys.exit(1)
+
+        import llm
+        import renderer
+
+        # 2. LLM analysis
+        with metrics.timer("llm"):
+            analyzed = llm.analyze(articles, shared, deadline.stage_end("llm", shared))
+        metrics.gauge("articles", len(analyzed), stage="analyzed")
+        metrics.gauge("degraded", len(deadline.notes))
+        _report_filtered(articles, analyzed)
+
+        # 3. Render
+        if not selected:
+            with metrics.timer("render"):
+                renderer.render(analyzed, config, output_path, deadline.notes)
+            metrics.inc("articles", len(analyzed), stage="rendered")
+
+    # Keep every analyzed article for trend queries (python run.py trends)
+    if getattr(config, "HISTORY", True):
+        import store
+
+        with metrics.timer("store"):
+            store.save(analyzed, shared)
+
+    pages = [output_path]
+    if selected:
+        pages = []
+        for profile in selected:
+            picked = profiles.select(analyzed, profile)
+            print(f"[profile] {profile.PROFILE}: {len(picked)} articles")
+            pages.append(pathlib.Path(__file__).parent / profile.OUTPUT_FILE)
+            with metrics.timer(f"render:{profile.PROFILE}"):
+                renderer.render(picked, profile, pages[-1], deadline.notes)
+            metrics.inc("articles", len(picked), stage="rendered")
+        output_path = pages[0]
 
     # 4. Deploy to GitHub Pages
     if args.deploy:
+        import subprocess
+
         print("[deploy] Pushing digest to GitHub Pages...")
         try:
-            deploy_to_gh_pages(output_path)
-            print("[deploy] Live at https://chichi-chang.github.io/daily_neurotech_ai")
+            with metrics.timer("deploy"):
+                deploy_to_gh_pages(output_path, pages[1:], timeout=deadline.remaining())
+            print(f"[deploy] Live at {config.SITE_URL}")
+        except subprocess.TimeoutExpired:
+            print("[deploy] Failed: push still running at the deadline — killed")
         except subprocess.CalledProcessError as e:
             print(f"[deploy] Failed: {e}")
             if e.stderr:
@@ -109,6 +356,8 @@ def main():
 
     # 5. Open
     if not args.no_open:
+        import webbrowser
+
         webbrowser.open(f"file://{output_path.resolve()}")
         print(f"[open] Opened in browser: {output_path}")
 
@@ -0,0 +1,171 @@
+"""
+search_index.py — Sharded inverted index for searching the digest archive
+in the browser.
+
+Every render appends the day's articles to an archive of doc chunks and
+rebuilds a token → article-ID index split into small shards by token
+prefix. The page's search box fetches only the shards for the typed tokens
+and the doc chunks for the hits, so a query touches a few KB no matter how
+big the archive grows.
+
+Layout under SEARCH_INDEX_DIR (next to the HTML file):
+  manifest.json     {"docs": N, "chunk": 500, "shards": [...], "version": ...}
+  docs/<n>.json     [[title, url, source, category, summary, date], ...]
+                    — article ID i lives in chunk i // chunk at i % chunk
+  idx/<prefix>.json {"token": [id deltas...], ...} — IDs ascending, stored
+                    as differences from the previous ID to keep shards small
+"""
+
+import datetime
+import json
+import re
+from pathlib import Path
+
+PREFIX_LEN = 2
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in into is it its of on or that the
+their this to was were will with new how why what who says after over about
+""".split())
+
+
+def tokenize(text):
+    """Lowercase alphanumeric tokens, minus stopwords and single characters.
+    Mirrored by searchTokens() in the page script."""
+    return [t for t in re.findall(r"[a-z0-9]+", text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+def update(articles, out_dir, config):
+    """Add `articles` to the archive in `out_dir` and rebuild the index."""
+    out_dir = Path(out_dir)
+    chunk_size = getattr(config, "SEARCH_DOCS_PER_CHUNK", 500)
+    docs = _load_docs(out_dir)
+    known = {d[1] for d in docs}
+
+    today = datetime.date.today().isoformat()
+    first_new = len(docs)
+    for a in articles:
+        if a.url in known:
+            continue
+        known.add(a.url)
+        docs.append([a.title, a.url, a.source, a.category or "other", a.one_line_summary or a.summary, today])
+
+    shards = {}
+    for doc_id, doc in enumerate(docs):
+        for token in set(tokenize(doc[0] + " " + doc[4])):
+            shards.setdefault(token[:PREFIX_LEN], {}).setdefault(token, []).append(doc_id)
+
+    # Only doc chunks that gained articles change; earlier ones are immutable
+    (out_dir / "docs").mkdir(parents=True, exist_ok=True)
+    for chunk in range(first_new // chunk_size, -(-len(docs) // chunk_size)):
+        _write_json(out_dir / "docs" / f"{chunk}.json", docs[chunk * chunk_size:(chunk + 1) * chunk_size])
+
+    idx_dir = out_dir / "idx"
+    idx_dir.mkdir(exist_ok=True)
+    for stale in set(p.stem for p in idx_dir.glob("*.json")) - set(shards):
+        (idx_dir / f"{stale}.json").unlink()
+    for prefix, postings in shards.items():
+        _write_json(idx_dir / f"{prefix}.json", {t: _deltas(ids) for t, ids in postings.items()})
+
+    _write_json(out_dir / "manifest.json", {
+        "docs": len(docs),
+        "chunk": chunk_size,
+        "prefix": PREFIX_LEN,
+        "shards": sorted(shards),
+        "version": datetime.datetime.now().strftime("%Y%m%d%H%M%S"),
+    })
+    print(f"[search] Indexed {len(docs)} articles ({len(docs) - first_new} new) into {len(shards)} shards")
+
+
+def _load_docs(out_dir):
+    docs = []
+    chunk = 0
+    while (out_dir / "docs" / f"{chunk}.json").exists():
+        docs += json.loads((out_dir / "docs" / f"{chunk}.json").read_text(encoding="utf-8"))
+        chunk += 1
+    return docs
+
+
+def _deltas(ids):
+    return [ids[0]] + [b - a for a, b in zip(ids, ids[1:])]
+
+
+def _write_json(path, data):
+    path.write_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+
+
+# Page script: tokenizes the query like tokenize() above, fetches the shard
+# for each token's prefix (the last token matches as a prefix, for
+# search-as-you-type), intersects the posting lists and loads only the doc
+# chunks holding the newest hits. Formatted with the index directory.
+SEARCH_JS = """
+const SEARCH_DIR = '%(dir)s';
+const STOPWORDS = new Set(%(stopwords)s);
+const searchCache = new Map();
+let searchManifest = null, searchTimer = null;
+
+function searchFetch(path) {
+  if (!searchCache.has(path)) {
+    const v = searchManifest ? '?v=' + searchManifest.version : '';
+    searchCache.set(path, fetch(SEARCH_DIR + '/' + path + v).then(r => r.ok ? r.json() : null).catch(() => null));
+  }
+  return searchCache.get(path);
+}
+
+function searchTokens(q) {
+  return (q.toLowerCase().match(/[a-z0-9]+/g) || []).filter(t => t.length > 1 && !STOPWORDS.has(t));
+}
+
+function searchIds(deltas) {
+  let id = 0;
+  return deltas.map((d, i) => id = i ? id + d : d);
+}
+
+async function searchMatches(token, prefixMatch) {
+  const shard = token.length >= searchManifest.prefix
+    ? await searchFetch('idx/' + token.slice(0, searchManifest.prefix) + '.json') : null;
+  const ids = new Set();
+  if (!shard) return ids;
+  for (const [t, deltas] of Object.entries(shard)) {
+    if (t === token || (prefixMatch && t.startsWith(token))) searchIds(deltas).forEach(id => ids.add(id));
+  }
+  return ids;
+}
+
+async function runSearch(q) {
+  const out = document.getElementById('search-results');
+  const tokens = searchTokens(q);
+  document.querySelector('main').classList.toggle('searching', tokens.length > 0);
+  if (!tokens.length) { out.innerHTML = ''; return; }
+  searchManifest = searchManifest || await searchFetch('manifest.json');
+  if (!searchManifest) { out.innerHTML = '<div class="empty">Search index unavailable.</div>'; return; }
+
+  const sets = await Promise.all(tokens.map((t, i) => searchMatches(t, i === tokens.length - 1)));
+  sets.sort((a, b) => a.size - b.size);
+  const hits = [...sets[0]].filter(id => sets.every(s => s.has(id))).sort((a, b) => b - a).slice(0, 50);
+  const chunks = await Promise.all([...new Set(hits.map(id => Math.floor(id / searchManifest.chunk)))]
+    .map(c => searchFetch('docs/' + c + '.json').then(docs => [c, docs || []])));
+  const byChunk = new Map(chunks);
+  const esc = s => String(s).replace(/[&<>"]/g, c => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'}[c]));
+  out.innerHTML = '<div class="search-count">' + hits.length + (hits.length === 50 ? '+' : '') + ' results</div>'
+    + '<div class="cards">' + hits.map(id => {
+      const d = byChunk.get(Math.floor(id / searchManifest.chunk))[id %% searchManifest.chunk];
+      return d ? '<a class="card" href="' + esc(d[1]) + '" target="_blank" rel="noopener">'
+        + '<div class="card-source">' + esc(d[2]) + ' · ' + esc(d[5]) + '</div>'
+        + '<div class="card-title">' + esc(d[0]) + '</div>'
+        + '<div class="card-summary">' + esc(d[4]) + '</div></a>' : '';
+    }).join('') + '</div>';
+}
+
+function onSearch(input) {
+  clearTimeout(searchTimer);
+  searchTimer = setTimeout(() => runSearch(input.value), 120);
+}
+"""
+
+
+def page_script(config):
+    return SEARCH_JS % {
+        "dir": getattr(config, "SEARCH_INDEX_DIR", "search"),
+        "stopwords": json.dumps(sorted(STOPWORDS)),
+    }
@@ -0,0 +1,197 @@
+"""
+store.py — History of every analyzed article, in SQLite.
+
+Each run adds its articles (date, source, category, matched keywords,
+canonical URL) to HISTORY_DB. An article seen again on a later day keeps
+its first date. Trend queries are GROUP BYs over indexed columns, so
+"BCI funding stories per week this quarter" stays a few milliseconds with
+years of history, and no old digest ever has to be re-read.
+
+Tables:
+  articles(id, url, day, source, category, title, summary, backend)
+  keywords(keyword, article_id, day, category, source)  — one row per
+      matched keyword; day/category/source are copied in so keyword queries
+      never need a join
+"""
+
+import datetime
+import re
+import sqlite3
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id       INTEGER PRIMARY KEY,
+    url      TEXT NOT NULL UNIQUE,
+    day      TEXT NOT NULL,
+    source   TEXT NOT NULL,
+    category TEXT NOT NULL,
+    title    TEXT NOT NULL,
+    summary  TEXT,
+    backend  TEXT
+);
+CREATE TABLE IF NOT EXISTS keywords (
+    keyword    TEXT NOT NULL,
+    article_id INTEGER NOT NULL REFERENCES articles(id),
+    day        TEXT NOT NULL,
+    category   TEXT NOT NULL,
+    source     TEXT NOT NULL,
+    PRIMARY KEY (keyword, article_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS articles_day ON articles(day, category, source);
+CREATE INDEX IF NOT EXISTS articles_category_day ON articles(category, day);
+CREATE INDEX IF NOT EXISTS articles_source_day ON articles(source, day);
+CREATE INDEX IF NOT EXISTS keywords_keyword_day ON keywords(keyword, day, category, source);
+"""
+
+# Query parameters that only say where a click came from
+TRACKING_PARAMS = re.compile(r"^(utm_\w+|fbclid|gclid|mc_cid|mc_eid|ref|ref_src|cmpid|ncid|sr_share)$", re.I)
+
+# Period → SQLite expression over the ISO `day` column
+PERIODS = {
+    "day": "day",
+    "week": "strftime('%Y-W%W', day)",
+    "month": "substr(day, 1, 7)",
+    "year": "substr(day, 1, 4)",
+}
+
+
+def canonical_url(url):
+    """The URL without tracking parameters, fragment, "www." or trailing
+    slash, so the same story shared through different feeds is one row."""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                             if not TRACKING_PARAMS.match(k)))
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower() or "https", host, path, query, ""))
+
+
+def connect(config):
+    path = Path(__file__).parent / getattr(config, "HISTORY_DB", "history.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def save(articles, config, day=None, replace=False):
+    """Record analyzed `articles` under `day` (default today). With `replace`,
+    articles already in the history get their new category, summary and
+    backend (re-classification); otherwise they're left as they are.
+
+    Articles categorized by the keyword fallback (backend "keywords", when
+    a --deadline left no time for the LLM) are skipped: that guess keeps
+    every article, and once stored it would stick, since a later LLM run
+    only adds new articles."""
+    from fetchers import matched_keywords
+
+    guessed = sum(1 for a in articles if a.backend == "keywords")
+    if guessed:
+        print(f"[store] Skipped {guessed} keyword-categorized articles (not LLM-checked)")
+        articles = [a for a in articles if a.backend != "keywords"]
+    day = day or datetime.date.today().isoformat()
+    keywords = [k.lower() for k in config.RSS_KEYWORDS]
+    added = updated = 0
+    with connect(config) as conn:
+        for a in articles:
+            if replace:
+                row = conn.execute("SELECT id FROM articles WHERE url = ?", (canonical_url(a.url),)).fetchone()
+                if row:
+                    conn.execute("UPDATE articles SET category = ?, summary = ?, backend = ? WHERE id = ?",
+                                 (a.category or "other", a.one_line_summary or a.summary, a.backend, row[0]))
+                    conn.execute("UPDATE keywords SET category = ? WHERE article_id = ?",
+                                 (a.category or "other", row[0]))
+                    updated += 1
+                    continue
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO articles (url, day, source, category, title, summary, backend) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (canonical_url(a.url), day, a.source, a.category or "other", a.title,
+                 a.one_line_summary or a.summary, a.backend))
+            if not cur.rowcount:
+                continue
+            added += 1
+            conn.executemany(
+                "INSERT OR IGNORE INTO keywords (keyword, article_id, day, category, source) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(kw, cur.lastrowid, day, a.category or "other", a.source)
+                 for kw in matched_keywords(a.title + " " + a.summary, keywords)])
+        total = conn.execute("SELECT count(*) FROM articles").fetchone()[0]
+        # Sampled statistics (a few ms) so the planner knows which index
+        # narrows a query, e.g. skip-scanning (keyword, day) for date ranges
+        conn.execute("PRAGMA analysis_limit = 400")
+        conn.execute("ANALYZE")
+    conn.close()
+    known = f"{updated} re-classified" if replace else f"{len(articles) - added} already known"
+    print(f"[store] Saved {added} new articles ({known}); {total} in history")
+
+
+def forget(articles, config):
+    """Remove `articles` from the history — for ones a re-classification
+    found no longer relevant. Articles not in the history are skipped."""
+    urls = [(canonical_url(a.url),) for a in articles]
+    with connect(config) as conn:
+        conn.executemany("DELETE FROM keywords WHERE article_id = (SELECT id FROM articles WHERE url = ?)", urls)
+        removed = conn.executemany("DELETE FROM articles WHERE url = ?", urls).rowcount
+    conn.close()
+    if removed:
+        print(f"[store] Removed {removed} articles no longer relevant")
+
+
+def load(conn, category=None, source=None, since=None, until=None):
+    """Articles from the history matching every given filter, as unanalyzed
+    Article records (for re-classification). The stored summary is the
+    one-line summary where there was one."""
+    from article import Article
+
+    where, params = _filters(category, source, None, since, until)
+    return [Article(title, summary or "", url, source)
+            for title, summary, url, source in conn.execute(
+                f"SELECT title, summary, url, source FROM articles {where} ORDER BY day, id", params)]
+
+
+def trend(conn, by="week", category=None, source=None, keyword=None, since=None, until=None):
+    """[(period, count), ...] of articles matching every given filter."""
+    if by not in PERIODS:
+        raise ValueError(f"by must be one of {', '.join(PERIODS)}")
+    where, params = _filters(category, source, keyword, since, until)
+    # Count per day straight off an index, then roll the days up into periods
+    return conn.execute(
+        f"SELECT {PERIODS[by]} AS period, sum(n) FROM "
+        f"(SELECT day, count(*) AS n FROM {_table(keyword)} {where} GROUP BY day) "
+        f"GROUP BY period ORDER BY period", params).fetchall()
+
+
+def top(conn, field, limit=10, category=None, source=None, keyword=None, since=None, until=None):
+    """[(value, count), ...] — the most common categories, sources or keywords."""
+    if field not in ("category", "source", "keyword"):
+        raise ValueError("field must be category, source or keyword")
+    if field == "keyword" and keyword:
+        raise ValueError("can't rank keywords while filtering by one")
+    where, params = _filters(category, source, keyword, since, until)
+    table = "keywords" if field == "keyword" else _table(keyword)
+    return conn.execute(
+        f"SELECT {field}, count(*) AS n FROM {table} {where} GROUP BY {field} ORDER BY n DESC LIMIT ?",
+        params + [limit]).fetchall()
+
+
+def _table(keyword):
+    # Both tables carry day, category and source; filtering by keyword reads
+    # only the keywords table and its (keyword, day, ...) index
+    return "keywords" if keyword else "articles"
+
+
+def _filters(category, source, keyword, since, until):
+    clauses, params = [], []
+    for clause, value in (("category = ?", category and category.lower()),
+                          ("source = ?", source),
+                          ("keyword = ?", keyword and keyword.lower()),
+                          ("day >= ?", since),
+                          ("day <= ?", until)):
+        if value:
+            clauses.append(clause)
+            params.append(value)
+    return ("WHERE " + " AND ".join(clauses)) if clauses else "", params